@@ -1,11 +1,18 @@
 import torch
+import torch.nn.functional as F
 import numpy as np
 import cv2
 import os
+import functools
 import scipy.signal
-from collections import deque
 from PySide6.QtCore import QObject
 
+# ONNXRuntime 为可选推理后端: 常量折叠/Conv+BN 融合 + 手工调优的 kernel
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
 # 尝试导入真实模型定义
 try:
     from app.core.algorithm.model import SwinUNet
@@ -13,6 +20,12 @@ except ImportError:
     print("[Warning] Could not import SwinUNet from app.core.algorithm.model")
     SwinUNet = None
 
+@functools.lru_cache(maxsize=8)
+def _design_lowpass(fps, cutoff, order=2):
+    """ 设计并缓存低通巴特沃斯系数 (每个 GazeEstimator 实例化都会用到) """
+    nyquist = fps / 2.0
+    return scipy.signal.butter(order, min(cutoff, nyquist - 0.1) / nyquist, btype='low')
+
 class SignalProcessor:
     """
     Applies filtering to smooth gaze data (Median + Low-pass).
@@ -23,44 +36,46 @@ class SignalProcessor:
         self.nyquist = fps / 2.0
         self.low_pass_cutoff = low_pass_cutoff
         self.buffer_size = buffer_size
-        
-        # 我们需要保持一个滑动窗口来实时滤波
+
         # 注意：scipy.signal.filtfilt 是双向滤波，需要未来数据，这在离线处理时很好，
-        # 但在实时处理时会有延迟。这里我们使用 lfilter 或仅对当前窗口做简单平滑。
-        # 为了实时性，我们使用一个简单的滑动平均或指数平滑，或者小窗口的中值滤波。
-        
-        # 存储最近 N 个预测值 (Pitch, Yaw)
-        self.history = deque(maxlen=buffer_size)
-        
-        # 滤波器状态 (如果使用 lfilter)
-        self.b, self.a = scipy.signal.butter(2, min(low_pass_cutoff, self.nyquist - 0.1) / self.nyquist, btype='low')
+        # 但在实时处理时会有延迟。这里我们使用中值去尖峰 + 指数平滑。
+
+        # 最近 3 个样本的环形暂存 (中值滤波只看 3 帧, 不必维护整个 deque 并逐帧拷贝)
+        self._rp = np.empty(3)
+        self._ry = np.empty(3)
+        self._count = 0
+        self.last_smooth = None
+
+        # 滤波器状态 (如果使用 lfilter); 系数设计走模块级缓存
+        self.b, self.a = _design_lowpass(fps, low_pass_cutoff)
         self.zi = scipy.signal.lfilter_zi(self.b, self.a) * 0
         self.zi = np.array([self.zi]*2).T # 为两个通道 (Pitch, Yaw) 准备状态
 
     def process_realtime(self, pitch, yaw):
         """ 实时滤波处理单帧数据 """
-        self.history.append([pitch, yaw])
-        
-        if len(self.history) < 3:
+        i = self._count % 3
+        self._rp[i] = pitch
+        self._ry[i] = yaw
+        self._count += 1
+
+        if self._count < 3:
             return pitch, yaw
-            
-        data = np.array(self.history)
-        
+
         # 1. 简单的中值滤波去除尖峰 (Median Filter)
-        # 取最近3帧的中值
-        med_pitch = np.median(data[-3:, 0])
-        med_yaw = np.median(data[-3:, 1])
-        
+        # 取最近3帧的中值: partition 比 np.median 对 n=3 更省
+        med_pitch = np.partition(self._rp, 1)[1]
+        med_yaw = np.partition(self._ry, 1)[1]
+
         # 2. 低通滤波 (Low-pass)
-        # 为了避免 lfilter 的状态管理复杂性，这里简化为加权移动平均 (EMA)
-        # 或者使用简单的 Alpha 滤波: y[n] = α * x[n] + (1-α) * y[n-1]
+        # 为了避免 lfilter 的状态管理复杂性，这里简化为指数平滑 (EMA)
+        # y[n] = α * x[n] + (1-α) * y[n-1]
         alpha = 0.3
-        if not hasattr(self, 'last_smooth'):
+        if self.last_smooth is None:
             self.last_smooth = np.array([med_pitch, med_yaw])
-        
+
         smoothed = alpha * np.array([med_pitch, med_yaw]) + (1 - alpha) * self.last_smooth
         self.last_smooth = smoothed
-        
+
         return smoothed[0], smoothed[1]
 
 class GazeEstimator(QObject):
@@ -71,7 +86,33 @@ class GazeEstimator(QObject):
     def __init__(self, model_path="model/checkpoint_best.pth"):
         super().__init__()
         self.device = self._select_device()
+
+        # 允许 TF32 matmul, 并打开 cudnn 自动调优 (输入尺寸固定 36x60, benchmark 稳赚)
+        torch.set_float32_matmul_precision('high')
+        if self.device.type == "cuda":
+            torch.backends.cudnn.benchmark = True
+
+        # GPU 上用半精度 autocast: CUDA 走 fp16 (tensor core), MPS 走 bf16
+        self._autocast_dtype = None
+        if self.device.type == "cuda":
+            self._autocast_dtype = torch.float16
+        elif self.device.type == "mps":
+            self._autocast_dtype = torch.bfloat16
+
+        # GPU 预处理的锁页(pinned)暂存缓冲, 形状随 ROI 变化惰性重建 (仅 CUDA 用)
+        self._staging = None
+
+        # CUDA Graph: batch=1 时把整网的 kernel 启动折叠成一次 graph replay
+        self._graph = None
+        self._static_in = None
+        self._static_out = None
+
+        # ONNXRuntime 会话 (可用时优先于 PyTorch 路径)
+        self.ort_session = None
+        self._ort_input = None
+
         self.model = None
+        self._eager_model = None  # 编译失败时的回退模型
         self.model_path = model_path
         self.is_loaded = False
         
@@ -130,7 +171,13 @@ class GazeEstimator(QObject):
             self.model.load_state_dict(new_state_dict, strict=False)
             self.model.to(self.device)
             self.model.eval()
-            
+
+            # 优先尝试 ONNXRuntime; 不可用时编译 PyTorch 模型
+            self._eager_model = self.model
+            if not self._init_onnx_runtime():
+                self._compile_model()
+                self._init_cuda_graph()
+
             self.is_loaded = True
             print(f"[GazeEstimator] Model loaded successfully on {self.device}")
             return True
@@ -140,6 +187,193 @@ class GazeEstimator(QObject):
             traceback.print_exc()
             return False
 
+    def _compile_model(self):
+        """
+        编译推理图: CUDA/MPS 走 torch.compile, CPU 走 torch.jit.trace
+        任一步失败则保持 eager 模式, 不影响功能
+        """
+        try:
+            # 预热一次, 让 BN 统计量/惰性初始化先走完
+            dummy = torch.zeros(1, 3, 36, 60, device=self.device)
+            with torch.inference_mode():
+                self.model(dummy)
+
+            if self.device.type in ("cuda", "mps"):
+                self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+                print("[GazeEstimator] Model compiled with torch.compile (reduce-overhead).")
+            else:
+                # CPU 回退路径: 优先 INT8 静态量化, 失败则用 TorchScript trace 做算子融合
+                if not self._quantize_cpu_model(dummy):
+                    with torch.inference_mode():
+                        self.model = torch.jit.trace(self.model, dummy)
+                    print("[GazeEstimator] Model traced with TorchScript.")
+        except Exception as e:
+            print(f"[GazeEstimator] Compile skipped, falling back to eager mode: {e}")
+            self.model = self._eager_model
+
+    def _init_onnx_runtime(self):
+        """
+        导出 SwinUNet 到 ONNX 并创建 ONNXRuntime 会话
+        ORT 做常量折叠与 Conv+BN 融合, CPU 上用 MLAS kernel, CUDA 上用 EP;
+        onnxruntime 未安装或导出失败时返回 False, 走 PyTorch 路径
+        """
+        if ort is None:
+            return False
+
+        try:
+            onnx_path = os.path.splitext(self.model_path)[0] + ".onnx"
+            if not os.path.exists(onnx_path) or \
+               os.path.getmtime(onnx_path) < os.path.getmtime(self.model_path):
+                # checkpoint 更新后重新导出
+                dummy = torch.zeros(1, 3, 36, 60)
+                try:
+                    torch.onnx.export(
+                        self._eager_model.cpu(), dummy, onnx_path,
+                        opset_version=17,
+                        input_names=['input'], output_names=['gaze'],
+                        dynamic_axes={'input': {0: 'N'}, 'gaze': {0: 'N'}}
+                    )
+                finally:
+                    # 导出失败也必须搬回原设备, 否则 CUDA 上模型滞留 CPU,
+                    # 之后每次前向都抛异常并被静默回退成 (0, 0)
+                    self._eager_model.to(self.device)
+                print(f"[GazeEstimator] Exported ONNX model to {onnx_path}")
+
+            so = ort.SessionOptions()
+            so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            so.intra_op_num_threads = 1
+            providers = ['CUDAExecutionProvider', 'CPUExecutionProvider'] \
+                if self.device.type == "cuda" else ['CPUExecutionProvider']
+            self.ort_session = ort.InferenceSession(onnx_path, sess_options=so,
+                                                    providers=providers)
+            self._ort_input = self.ort_session.get_inputs()[0].name
+            print(f"[GazeEstimator] Using ONNXRuntime ({self.ort_session.get_providers()[0]}).")
+            return True
+        except Exception as e:
+            print(f"[GazeEstimator] ONNXRuntime unavailable, using PyTorch: {e}")
+            self.ort_session = None
+            return False
+
+    def _init_cuda_graph(self):
+        """
+        捕获 batch=1 前向的 CUDA Graph
+        36x60 小网络的推理被 kernel 启动延迟主导, replay 把整图的启动
+        折叠为一次 cudaGraphLaunch; 仅 CUDA 支持, 其余设备直接前向
+        """
+        if self.device.type != "cuda":
+            return
+
+        try:
+            self._static_in = torch.empty((1, 3, 36, 60), device=self.device)
+
+            # 侧流上预热几轮, 让 cudnn benchmark / 编译缓存稳定
+            side = torch.cuda.Stream()
+            side.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(side), torch.inference_mode():
+                with torch.autocast(self.device.type, dtype=self._autocast_dtype):
+                    for _ in range(3):
+                        self.model(self._static_in)
+            torch.cuda.current_stream().wait_stream(side)
+
+            self._graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self._graph), torch.inference_mode():
+                with torch.autocast(self.device.type, dtype=self._autocast_dtype):
+                    self._static_out = self.model(self._static_in)
+
+            print("[GazeEstimator] CUDA Graph captured for batch=1 inference.")
+        except Exception as e:
+            print(f"[GazeEstimator] CUDA Graph capture failed, using direct calls: {e}")
+            self._graph = None
+
+    def _quantize_cpu_model(self, example_input):
+        """
+        CPU 路径的 FX 静态 INT8 量化 (FBGEMM 后端)
+        在 AVX2/VNNI CPU 上, int8 GEMM + Conv/BN 融合可显著降低 SwinBlock 的推理耗时
+        标定数据优先使用 model/calibration/ 下的眼部图像, 没有则退化为随机数据
+        """
+        try:
+            from torch.ao.quantization import get_default_qconfig_mapping
+            from torch.ao.quantization import quantize_fx
+
+            torch.backends.quantized.engine = 'fbgemm'
+            # 小模型多线程反而因调度开销变慢, 且避免与 MediaPipe 抢核
+            torch.set_num_threads(1)
+
+            qconfig_mapping = get_default_qconfig_mapping("fbgemm")
+            prepared = quantize_fx.prepare_fx(self._eager_model, qconfig_mapping,
+                                              example_inputs=(example_input,))
+
+            # 标定 (Calibration)
+            calib_inputs = self._load_calibration_inputs()
+            if not calib_inputs:
+                calib_inputs = [torch.randn(1, 3, 36, 60) for _ in range(8)]
+            with torch.inference_mode():
+                for t in calib_inputs:
+                    prepared(t)
+
+            self.model = quantize_fx.convert_fx(prepared)
+            print("[GazeEstimator] CPU model quantized to INT8 (FBGEMM).")
+            return True
+        except Exception as e:
+            print(f"[GazeEstimator] INT8 quantization unavailable: {e}")
+            return False
+
+    def _load_calibration_inputs(self, calib_dir="model/calibration", max_images=16):
+        """ 读取标定图像并转成与 predict 相同的归一化张量 """
+        inputs = []
+        if not os.path.isdir(calib_dir):
+            return inputs
+        for name in sorted(os.listdir(calib_dir))[:max_images]:
+            img = cv2.imread(os.path.join(calib_dir, name))
+            if img is None:
+                continue
+            img = cv2.resize(img, (60, 36)).astype(np.float32) / 255.0
+            img = (img - 0.5) / 0.5
+            inputs.append(torch.from_numpy(img).permute(2, 0, 1).unsqueeze(0))
+        return inputs
+
+    def _preprocess_np(self, eye_roi):
+        """ CPU 预处理: Resize 36x60 -> Normalize [-1, 1] -> (3,36,60) float32 """
+        # 显式 INTER_LINEAR: 走 OpenCV 的 SIMD 快速路径, 对 60x36 目标精度足够
+        input_img = cv2.resize(eye_roi, (60, 36), interpolation=cv2.INTER_LINEAR)
+        input_img = input_img.astype(np.float32) / 255.0
+        input_img = (input_img - 0.5) / 0.5 # Normalize [-1, 1]
+        return np.ascontiguousarray(input_img.transpose(2, 0, 1))
+
+    def _preprocess(self, eye_roi):
+        """
+        预处理: Resize 36x60 -> Normalize [-1, 1] -> (1,3,36,60) Tensor
+        GPU 上直接上传原始 uint8 裁剪图, resize/归一化在设备端一次完成,
+        省掉 CPU 侧的多次内存拷贝; CPU 上保留 cv2 路径 (SIMD resize 更快)
+        """
+        if self.device.type == "cpu":
+            return torch.from_numpy(self._preprocess_np(eye_roi)).unsqueeze(0)
+
+        src = torch.from_numpy(eye_roi)
+        if self.device.type == "cuda":
+            # 经锁页暂存缓冲做异步 H2D 拷贝
+            if self._staging is None or self._staging.shape != src.shape:
+                self._staging = torch.empty_like(src, pin_memory=True)
+            self._staging.copy_(src)
+            src = self._staging
+        t = src.to(self.device, non_blocking=True).permute(2, 0, 1).unsqueeze(0).float()
+        t = F.interpolate(t, size=(36, 60), mode='bilinear', align_corners=False)
+        t.sub_(127.5).div_(127.5) # Normalize [-1, 1]
+        return t
+
+    def _forward(self, input_tensor):
+        """ 前向推理, GPU 上自动启用半精度 autocast; batch=1 走 CUDA Graph replay """
+        if self._graph is not None and input_tensor.shape == self._static_in.shape:
+            self._static_in.copy_(input_tensor)
+            self._graph.replay()
+            return self._static_out
+
+        with torch.inference_mode():
+            if self._autocast_dtype is not None:
+                with torch.autocast(self.device.type, dtype=self._autocast_dtype):
+                    return self.model(input_tensor)
+            return self.model(input_tensor)
+
     def predict(self, eye_roi):
         """
         推理单帧眼部图像
@@ -150,39 +384,61 @@ class GazeEstimator(QObject):
         """
         if not self.is_loaded or eye_roi is None:
             return 0.0, 0.0
+        return self.predict_batch([eye_roi])[0]
+
+    def predict_batch(self, eye_rois):
+        """
+        批量推理多帧眼部图像: 单次 (N,3,36,60) 前向代替 N 次 batch=1 前向,
+        摊薄 kernel 启动与 Python 调度开销
+        Args:
+            eye_rois: list of np.array (H, W, 3) RGB images
+        Returns:
+            list of (pitch, yaw) in degrees, 与输入顺序一致
+        """
+        if not self.is_loaded or not eye_rois:
+            return [(0.0, 0.0)] * len(eye_rois)
 
         try:
-            # 预处理: Resize 36x60 -> Normalize -> Tensor
-            input_img = cv2.resize(eye_roi, (60, 36)) 
-            input_img = input_img.astype(np.float32) / 255.0
-            input_img = (input_img - 0.5) / 0.5 # Normalize [-1, 1]
-            
-            # HWC -> CHW -> Batch
-            input_tensor = torch.from_numpy(input_img).permute(2, 0, 1).unsqueeze(0).to(self.device)
+            # ONNXRuntime 路径 (可用时优先)
+            if self.ort_session is not None:
+                batch_np = np.stack([self._preprocess_np(r) for r in eye_rois])
+                vecs = self.ort_session.run(None, {self._ort_input: batch_np})[0]
+                return [self._vector_to_gaze(vec) for vec in vecs]
+
+            batch = torch.cat([self._preprocess(r) for r in eye_rois], dim=0)
+
+            # 推理 (inference_mode 比 no_grad 省去版本计数开销)
+            try:
+                output = self._forward(batch)
+            except Exception:
+                # 编译模型执行失败 (如动态形状触发重编译异常), 回退 eager
+                self.model = self._eager_model
+                output = self._forward(batch)
+            vecs = output.float().cpu().numpy()
+
+            # 滤波器有状态, 必须按帧序逐个处理
+            return [self._vector_to_gaze(vec) for vec in vecs]
 
-            # 推理
-            with torch.no_grad():
-                output = self.model(input_tensor)
-                vec = output.cpu().numpy()[0]
-            
-            # 坐标系转换 (参考 gui_visualizer.py 的 vector_to_pitch_yaw)
-            # Gaze Vector (x, y, z) -> Pitch/Yaw
-            if len(vec) == 3:
-                x, y, z = vec
-                # pitch = arcsin(-y)
-                # yaw = arctan2(-x, -z)
-                pitch = np.arcsin(np.clip(-y, -1.0, 1.0))
-                yaw = np.arctan2(-x, -z)
-                
-                raw_pitch_deg = np.degrees(pitch)
-                raw_yaw_deg = np.degrees(yaw)
-                
-                # 实时滤波
-                smooth_p, smooth_y = self.processor.process_realtime(raw_pitch_deg, raw_yaw_deg)
-                return smooth_p, smooth_y
-                
-            return 0.0, 0.0
-            
         except Exception as e:
             print(f"Inference error: {e}")
+            return [(0.0, 0.0)] * len(eye_rois)
+
+    def _vector_to_gaze(self, vec):
+        """
+        坐标系转换 (参考 gui_visualizer.py 的 vector_to_pitch_yaw)
+        Gaze Vector (x, y, z) -> Pitch/Yaw (度), 并做实时滤波
+        """
+        if len(vec) != 3:
             return 0.0, 0.0
+
+        x, y, z = vec
+        # pitch = arcsin(-y)
+        # yaw = arctan2(-x, -z)
+        pitch = np.arcsin(np.clip(-y, -1.0, 1.0))
+        yaw = np.arctan2(-x, -z)
+
+        raw_pitch_deg = np.degrees(pitch)
+        raw_yaw_deg = np.degrees(yaw)
+
+        # 实时滤波
+        return self.processor.process_realtime(raw_pitch_deg, raw_yaw_deg)
@@ -87,28 +87,51 @@ class SwinUNet(nn.Module):
         return x
 
 
+class ChannelLinear(nn.Linear):
+    """
+    Channel-mixing linear layer, equivalent to a 1x1 Conv2d.
+    torch.compile fuses the permute+matmul+permute with neighboring
+    pointwise ops (GELU/BN) far more aggressively than the conv kernel,
+    which is memory-bound at these tiny spatial sizes.
+    Loads legacy (O, I, 1, 1) conv weights transparently.
+    """
+
+    def forward(self, x):
+        # B, C, H, W -> B, H, W, C -> linear -> back
+        x = x.permute(0, 2, 3, 1)
+        x = super().forward(x)
+        return x.permute(0, 3, 1, 2)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # 兼容旧 checkpoint: 1x1 Conv2d 权重 (O, I, 1, 1) -> (O, I)
+        w = state_dict.get(prefix + 'weight')
+        if w is not None and w.dim() == 4:
+            state_dict[prefix + 'weight'] = w.reshape(w.shape[0], w.shape[1])
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+
 class SwinBlock(nn.Module):
     """Simplified Swin Transformer Block with depthwise separable convolution."""
-    
+
     def __init__(self, dim, num_heads, window_size, drop_rate):
         super().__init__()
         self.dim = dim
         self.window_size = window_size
-        
-        # Simplified attention using depthwise conv
+
+        # Simplified attention using depthwise conv + channel mixing
         self.norm1 = nn.BatchNorm2d(dim)
         self.attn = nn.Sequential(
             nn.Conv2d(dim, dim, kernel_size=window_size, padding=window_size//2, groups=dim),
-            nn.Conv2d(dim, dim, kernel_size=1),
+            ChannelLinear(dim, dim),
         )
-        
+
         # MLP
         self.norm2 = nn.BatchNorm2d(dim)
         self.mlp = nn.Sequential(
-            nn.Conv2d(dim, dim * 4, kernel_size=1),
+            ChannelLinear(dim, dim * 4),
             nn.GELU(),
             nn.Dropout2d(drop_rate),
-            nn.Conv2d(dim * 4, dim, kernel_size=1),
+            ChannelLinear(dim * 4, dim),
             nn.Dropout2d(drop_rate)
         )
         
@@ -1,10 +1,21 @@
+import os
+import time
+import threading
 import cv2
 import mediapipe as mp
 import numpy as np
 
+# Tasks API 的 FaceLandmarker 模型文件 (需单独下载, 不随仓库分发)
+FACE_LANDMARKER_TASK = "model/face_landmarker.task"
+
 class MediaPipeEyeExtractor:
-    """ 使用 MediaPipe FaceMesh 提取眼部 ROI """
-    
+    """
+    使用 MediaPipe 提取眼部 ROI
+    当 model/face_landmarker.task 存在时走 Tasks API 的 LIVE_STREAM 模式:
+    图由 MediaPipe 自己的 C++ 线程驱动, 推理期间释放 GIL, 采集/写盘线程
+    不再被关键点检测串行阻塞; 否则回退到旧的 solutions.FaceMesh 同步接口
+    """
+
     # 左眼关键点索引 (FaceMesh)
     LEFT_EYE_IDX = [33, 133, 160, 159, 158, 144, 145, 153] # 简化的轮廓
     # 更精确的左眼角点用于裁剪
@@ -14,14 +25,54 @@ class MediaPipeEyeExtractor:
     LEFT_EYE_LOWER = 145
 
     def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        self.landmarker = None
+        self.face_mesh = None
+        # BGR->RGB 转换的持久缓冲 (按首帧尺寸惰性分配, 避免每帧 ~6MB 的新分配)
+        self._rgb = None
+
+        if os.path.exists(FACE_LANDMARKER_TASK):
+            try:
+                self._init_live_stream()
+                print("[Segmentor] Using MediaPipe Tasks FaceLandmarker (LIVE_STREAM).")
+            except Exception as e:
+                print(f"[Segmentor] Tasks API unavailable, falling back to FaceMesh: {e}")
+                self.landmarker = None
+
+        if self.landmarker is None:
+            self.mp_face_mesh = mp.solutions.face_mesh
+            self.face_mesh = self.mp_face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+
+    def _init_live_stream(self):
+        """ 构建 LIVE_STREAM 模式的 FaceLandmarker, 结果经回调送回 """
+        BaseOptions = mp.tasks.BaseOptions
+        FaceLandmarker = mp.tasks.vision.FaceLandmarker
+        FaceLandmarkerOptions = mp.tasks.vision.FaceLandmarkerOptions
+        VisionRunningMode = mp.tasks.vision.RunningMode
+
+        self._result = None
+        self._result_ts = -1
+        self._result_event = threading.Event()
+        self._ts_ms = 0
+
+        options = FaceLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=FACE_LANDMARKER_TASK),
+            running_mode=VisionRunningMode.LIVE_STREAM,
+            num_faces=1,
+            result_callback=self._on_result
         )
+        self.landmarker = FaceLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """ MediaPipe C++ 线程回调 """
+        self._result = result
+        self._result_ts = timestamp_ms
+        self._result_event.set()
 
     def process(self, frame):
         """
@@ -31,39 +82,75 @@ class MediaPipeEyeExtractor:
         Returns:
             results: MediaPipe results
             eye_roi: Cropped eye image (BGR) or None
+                     注意: 返回的是 frame 的视图 (非拷贝), 生命周期随 frame;
+                     调用方如需跨帧持有必须自行 .copy()
         """
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        rgb_frame = self._rgb
+
+        if self.landmarker is not None:
+            return self._process_live_stream(frame, rgb_frame)
+
         results = self.face_mesh.process(rgb_frame)
-        
+
         eye_roi = None
-        
         if results.multi_face_landmarks:
             landmarks = results.multi_face_landmarks[0].landmark
-            h, w, _ = frame.shape
-            
-            # 提取左眼坐标 (归一化 -> 像素坐标)
-            p_out = landmarks[self.LEFT_EYE_OUTER]
-            p_in = landmarks[self.LEFT_EYE_INNER]
-            p_up = landmarks[self.LEFT_EYE_UPPER]
-            p_low = landmarks[self.LEFT_EYE_LOWER]
-            
-            # 计算包围盒
-            x_min = min(p_out.x, p_in.x) * w
-            x_max = max(p_out.x, p_in.x) * w
-            y_min = min(p_up.y, p_low.y) * h
-            y_max = max(p_up.y, p_low.y) * h
-            
-            # 添加 padding
-            pad_w = (x_max - x_min) * 0.5
-            pad_h = (y_max - y_min) * 0.8
-            
-            x1 = int(max(0, x_min - pad_w))
-            x2 = int(min(w, x_max + pad_w))
-            y1 = int(max(0, y_min - pad_h))
-            y2 = int(min(h, y_max + pad_h))
-            
-            if x2 > x1 and y2 > y1:
-                eye_roi = frame[y1:y2, x1:x2].copy()
-                
+            eye_roi = self._crop_eye(frame, landmarks)
+
         return results, eye_roi
 
+    def _process_live_stream(self, frame, rgb_frame, timeout=0.05):
+        """
+        LIVE_STREAM 推理: detect_async 提交后等待对应时间戳的回调
+        推理在 MediaPipe 的 C++ 线程中进行, 等待期间本线程释放 GIL
+        """
+        self._ts_ms += 1
+        ts = self._ts_ms
+
+        self._result_event.clear()
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        self.landmarker.detect_async(mp_image, ts)
+
+        if not self._result_event.wait(timeout) or self._result_ts != ts:
+            return None, None
+
+        result = self._result
+        eye_roi = None
+        if result is not None and result.face_landmarks:
+            eye_roi = self._crop_eye(frame, result.face_landmarks[0])
+
+        return result, eye_roi
+
+    # padding 系数与裁剪范围常量 (向量化计算用)
+    _PAD = np.array([0.5, 0.8])
+
+    def _crop_eye(self, frame, landmarks):
+        """ 从关键点计算左眼包围盒并裁剪 (向量化) """
+        h, w, _ = frame.shape
+
+        # 提取左眼坐标 (归一化 -> 像素坐标), 4 个角点一次性成组计算
+        p_out = landmarks[self.LEFT_EYE_OUTER]
+        p_in = landmarks[self.LEFT_EYE_INNER]
+        p_up = landmarks[self.LEFT_EYE_UPPER]
+        p_low = landmarks[self.LEFT_EYE_LOWER]
+        pts = np.array([[p_out.x, p_out.y],
+                        [p_in.x, p_in.y],
+                        [p_up.x, p_up.y],
+                        [p_low.x, p_low.y]]) * np.array([w, h])
+
+        # 包围盒 + padding + 裁剪边界, 全部用数组运算
+        p_min = pts.min(0)
+        p_max = pts.max(0)
+        pad = (p_max - p_min) * self._PAD
+
+        x1, y1 = np.clip(p_min - pad, 0, [w, h]).astype(int)
+        x2, y2 = np.clip(p_max + pad, 0, [w, h]).astype(int)
+
+        if x2 > x1 and y2 > y1:
+            # 返回视图而非拷贝: 下游 (estimator.predict) 立即 resize/归一化,
+            # 不会跨帧持有
+            return frame[y1:y2, x1:x2]
+        return None
@@ -3,38 +3,61 @@ Nystagmus Signal Processing & Analysis Module
 基于 pvestibular.py 和 hit_utils.py 的核心算法
 """
 
+import functools
 import numpy as np
 import scipy.signal as signal
 
+# Numba 为可选加速依赖: 装了就 JIT 编译斜率内核, 没装走纯 Python 回退
+try:
+    import numba
+except ImportError:
+    numba = None
+
+@functools.lru_cache(maxsize=32)
+def _design_sos(cutoff, fs, order, btype):
+    """
+    设计巴特沃斯 SOS 滤波器并缓存系数
+    SOS (二阶节) 比 (b, a) 数值更稳定, 且 sosfiltfilt 内存开销更小
+    cutoff 为标量 (高/低通) 或 (low, high) 元组 (带通)
+    """
+    nyquist = 0.5 * fs
+    if isinstance(cutoff, tuple):
+        normal_cutoff = [c / nyquist for c in cutoff]
+        if normal_cutoff[1] >= 1:
+            return None
+    else:
+        normal_cutoff = cutoff / nyquist
+        if normal_cutoff >= 1:
+            return None
+    return signal.butter(order, normal_cutoff, btype=btype, analog=False, output='sos')
+
+def _sos_padlen(sos, n):
+    """
+    按信号长度钳位 sosfiltfilt 的边界延拓长度
+    默认值由滤波器阶数推出 (本项目参数下约 33), 短记录不钳位会直接
+    ValueError; 与原 filtfilt 路径的 padlen=min(len(data)-1, ...) 等价
+    """
+    return max(0, min(n - 1, 3 * (2 * len(sos) + 1)))
+
 def butter_highpass_filter(data, cutoff, fs, order=5):
     """
     零相位高通巴特沃斯滤波器
     用于去除低频漂移
     """
-    nyquist = 0.5 * fs
-    normal_cutoff = cutoff / nyquist
-    
-    if normal_cutoff >= 1:
+    sos = _design_sos(cutoff, fs, order, 'high')
+    if sos is None:
         return data
-    
-    b, a = signal.butter(order, normal_cutoff, btype='high', analog=False)
-    filtered_data = signal.filtfilt(b, a, data, padlen=min(len(data)-1, 3*(max(len(b), len(a))-1)))
-    return filtered_data
+    return signal.sosfiltfilt(sos, data, padlen=_sos_padlen(sos, len(data)))
 
 def butter_lowpass_filter(data, cutoff, fs, order=5):
     """
     零相位低通巴特沃斯滤波器
     用于平滑信号
     """
-    nyquist = 0.5 * fs
-    normal_cutoff = cutoff / nyquist
-    
-    if normal_cutoff >= 1:
+    sos = _design_sos(cutoff, fs, order, 'low')
+    if sos is None:
         return data
-    
-    b, a = signal.butter(order, normal_cutoff, btype='low', analog=False)
-    filtered_data = signal.filtfilt(b, a, data, padlen=min(len(data)-1, 3*(max(len(b), len(a))-1)))
-    return filtered_data
+    return signal.sosfiltfilt(sos, data, padlen=_sos_padlen(sos, len(data)))
 
 def signal_preprocess(timestamps, eye_angles,
                      highpass_parameter={'cutoff': 0.1, 'fs': 60, 'order': 5},
@@ -62,14 +85,26 @@ def signal_preprocess(timestamps, eye_angles,
     timestamps = timestamps[:min_len]
     eye_angles = eye_angles[:min_len]
     
-    # 1. 高通滤波 (去直流漂移)
-    signal_filtered = butter_highpass_filter(eye_angles, **highpass_parameter)
-    
-    # 2. 低通滤波 (去噪)
-    signal_filtered = butter_lowpass_filter(signal_filtered, **lowpass_parameter)
+    # 1+2. 高通 (去直流漂移) + 低通 (去噪)
+    # 把两组 SOS 堆叠成一个级联滤波器, 数据只遍历一次;
+    # 响应与依次高通再低通一致 (直接设计的带通响应不同, 不能替代)
+    hp_sos = _design_sos(highpass_parameter['cutoff'], highpass_parameter['fs'],
+                         highpass_parameter['order'], 'high')
+    lp_sos = _design_sos(lowpass_parameter['cutoff'], lowpass_parameter['fs'],
+                         lowpass_parameter['order'], 'low')
+    if hp_sos is not None and lp_sos is not None:
+        sos = np.vstack([hp_sos, lp_sos])
+        signal_filtered = signal.sosfiltfilt(sos, eye_angles,
+                                             padlen=_sos_padlen(sos, len(eye_angles)))
+    else:
+        # 某一侧截止频率失效 (>= Nyquist) 时按原两段路径各自处理/跳过
+        signal_filtered = butter_highpass_filter(eye_angles, **highpass_parameter)
+        signal_filtered = butter_lowpass_filter(signal_filtered, **lowpass_parameter)
     
     # 3. 插值 (提高分辨率)
-    signal_filtered = signal.resample(signal_filtered, int(len(eye_angles) * interpolate_ratio))
+    # resample_poly 用多相 FIR, O(N*taps), 避免整段 FFT 与复数中间数组
+    signal_filtered = signal.resample_poly(signal_filtered, interpolate_ratio, 1,
+                                           window=('kaiser', 8.6))
     
     # 4. 生成新的时间序列
     time = np.linspace(timestamps[0], timestamps[-1], len(signal_filtered))
@@ -94,35 +129,51 @@ def find_turning_points(signal_data, prominence=0.1, distance=150):
     turning_points = np.sort(np.concatenate([peaks, valleys]))
     return turning_points
 
+def _calculate_slopes_kernel(time, signal_data, turning_points):
+    """ 斜率计算内核: 预分配输出, 逐段求差商 (Numba 可编译) """
+    n = len(turning_points) - 1
+    slope_times = np.empty(n)
+    slopes = np.empty(n)
+    count = 0
+
+    for i in range(n):
+        idx1 = turning_points[i]
+        idx2 = turning_points[i + 1]
+
+        delta_pos = signal_data[idx2] - signal_data[idx1]
+        delta_time = time[idx2] - time[idx1]
+
+        if delta_time > 0:
+            slopes[count] = delta_pos / delta_time
+            slope_times[count] = (time[idx1] + time[idx2]) / 2
+            count += 1
+
+    return slope_times[:count], slopes[:count]
+
+if numba is not None:
+    _calculate_slopes_kernel = numba.njit(cache=True, fastmath=True)(_calculate_slopes_kernel)
+
 def calculate_slopes(time, signal_data, turning_points):
     """
     计算相邻转折点之间的斜率 (速度)
-    
+
     Args:
         time: 时间序列
         signal_data: 信号数据
         turning_points: 转折点索引
-    
+
     Returns:
         slope_times: 斜率对应的时间点
         slopes: 斜率数组 (°/s)
     """
-    slopes = []
-    slope_times = []
-    
-    for i in range(len(turning_points) - 1):
-        idx1 = turning_points[i]
-        idx2 = turning_points[i + 1]
-        
-        delta_pos = signal_data[idx2] - signal_data[idx1]
-        delta_time = time[idx2] - time[idx1]
-        
-        if delta_time > 0:
-            slope = delta_pos / delta_time
-            slopes.append(slope)
-            slope_times.append((time[idx1] + time[idx2]) / 2)
-    
-    return np.array(slope_times), np.array(slopes)
+    if len(turning_points) < 2:
+        return np.array([]), np.array([])
+
+    return _calculate_slopes_kernel(
+        np.ascontiguousarray(time, dtype=np.float64),
+        np.ascontiguousarray(signal_data, dtype=np.float64),
+        np.ascontiguousarray(turning_points, dtype=np.int64)
+    )
 
 def identify_nystagmus_patterns(signal_data, time, min_time=0.3, max_time=0.8,
                                 min_ratio=1.4, max_ratio=8.0, direction_axis='horizontal'):
@@ -151,72 +202,70 @@ def identify_nystagmus_patterns(signal_data, time, min_time=0.3, max_time=0.8,
     
     # 计算斜率
     slope_times, slopes = calculate_slopes(time, signal_data, turning_points)
-    
-    # 模式识别
-    patterns = []
-    for i in range(1, len(turning_points) - 1):
-        idx_prev = turning_points[i-1]
-        idx_curr = turning_points[i]
-        idx_next = turning_points[i+1]
-        
-        time_seg1 = time[idx_curr] - time[idx_prev]
-        time_seg2 = time[idx_next] - time[idx_curr]
-        
-        slope1 = slopes[i-1] if i-1 < len(slopes) else 0
-        slope2 = slopes[i] if i < len(slopes) else 0
-        
-        # 避免除零
-        if abs(slope1) < 1e-6 or abs(slope2) < 1e-6:
-            continue
-        
-        ratio = abs(slope1 / slope2)
-        
-        # 判断快相在前还是慢相在前
-        fast_phase_first = ratio > 1
-        
-        if fast_phase_first:
-            fast_time, slow_time = time_seg1, time_seg2
-            fast_slope, slow_slope = abs(slope1), abs(slope2)
-        else:
-            fast_time, slow_time = time_seg2, time_seg1
-            fast_slope, slow_slope = abs(slope2), abs(slope1)
-            ratio = 1 / ratio
-        
-        # 筛选条件
-        time_valid = (min_time <= fast_time <= max_time) and (min_time <= slow_time <= max_time)
-        ratio_valid = (min_ratio <= ratio <= max_ratio)
-        
-        if time_valid and ratio_valid:
-            patterns.append({
-                'index': i,
-                'fast_phase_first': fast_phase_first,
-                'fast_time': fast_time,
-                'slow_time': slow_time,
-                'ratio': ratio,
-                'slow_slope': slow_slope,
-                'fast_slope': fast_slope,
-            })
-    
+
+    # 模式识别 (向量化: 对每个内部转折点 i, 比较其前后两段)
+    t_tp = time[turning_points]
+    time_seg1 = t_tp[1:-1] - t_tp[:-2]   # 前一段时长
+    time_seg2 = t_tp[2:] - t_tp[1:-1]    # 后一段时长
+
+    # calculate_slopes 可能跳过 delta_time<=0 的段, 补零对齐 (零斜率会被后续筛除)
+    if len(slopes) < len(turning_points) - 1:
+        slopes = np.pad(slopes, (0, len(turning_points) - 1 - len(slopes)))
+    s1 = slopes[:-1]
+    s2 = slopes[1:]
+
+    # 避免除零
+    valid = (np.abs(s1) >= 1e-6) & (np.abs(s2) >= 1e-6)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.abs(s1 / s2)
+
+    # 判断快相在前还是慢相在前
+    fast_phase_first = ratio > 1
+    fast_time = np.where(fast_phase_first, time_seg1, time_seg2)
+    slow_time = np.where(fast_phase_first, time_seg2, time_seg1)
+    fast_slope = np.where(fast_phase_first, np.abs(s1), np.abs(s2))
+    slow_slope = np.where(fast_phase_first, np.abs(s2), np.abs(s1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(fast_phase_first, ratio, 1.0 / ratio)
+
+    # 筛选条件
+    mask = (valid
+            & (min_time <= fast_time) & (fast_time <= max_time)
+            & (min_time <= slow_time) & (slow_time <= max_time)
+            & (min_ratio <= ratio) & (ratio <= max_ratio))
+
+    # 仅对通过筛选的模式构造字典
+    selected = np.nonzero(mask)[0]
+    patterns = [{
+        'index': int(j) + 1,
+        'fast_phase_first': bool(fast_phase_first[j]),
+        'fast_time': float(fast_time[j]),
+        'slow_time': float(slow_time[j]),
+        'ratio': float(ratio[j]),
+        'slow_slope': float(slow_slope[j]),
+        'fast_slope': float(fast_slope[j]),
+    } for j in selected]
+
     # 判断眼震方向 (基于慢相的方向)
-    if patterns:
-        slow_slopes = [p['slow_slope'] * (1 if p['fast_phase_first'] else -1) for p in patterns]
-        avg_slow_slope = np.mean(slow_slopes)
-        
+    if len(selected) > 0:
+        signed_slow = slow_slope[selected] * np.where(fast_phase_first[selected], 1, -1)
+        avg_slow_slope = np.mean(signed_slow)
+
         if direction_axis == 'horizontal':
             direction = 'right' if avg_slow_slope > 0 else 'left'
         else: # vertical
             direction = 'up' if avg_slow_slope > 0 else 'down'
-        
+
         # 计算 SPV (Slow Phase Velocity) - 慢相平均速度
-        pattern_spv = np.mean([abs(p['slow_slope']) for p in patterns])
-        
+        spv_values = slow_slope[selected]
+        pattern_spv = np.mean(spv_values)
+
         # 计算 CV (Coefficient of Variation) - 变异系数
-        spv_values = [abs(p['slow_slope']) for p in patterns]
-        cv = (np.std(spv_values) / np.mean(spv_values) * 100) if np.mean(spv_values) > 0 else 0
+        cv = (np.std(spv_values) / pattern_spv * 100) if pattern_spv > 0 else 0
     else:
         direction = 'unknown'
         pattern_spv = 0.0
         cv = 0.0
-    
+
     return patterns, patterns, direction, pattern_spv, cv
 
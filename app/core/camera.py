@@ -3,95 +3,141 @@ import time
 import queue
 import threading
 import os
-from PySide6.QtCore import QThread, Signal, QObject
+import numpy as np
+from PySide6.QtCore import Qt, QThread, Signal, QObject
 from PySide6.QtGui import QImage
 
 from app.core.algorithm.segmentor import MediaPipeEyeExtractor
 from app.core.algorithm.estimator import GazeEstimator
+from app.core.preview import RgbFramePool
 from app.core.recorder import DataRecorder
+from app.core.source import CameraSource
 
 class VideoRecorder:
-    """ 独立的视频写入类 """
-    def __init__(self, filename, width, height, fps):
+    """
+    独立的视频写入类 (优先硬件编码, 失败回退 MJPG 软编)
+    写入经有界队列交给专用写盘线程, 编码/IO 不再阻塞采集循环;
+    队列满时丢弃最旧帧并计数, 比阻塞采集丢帧更可控
+    """
+    def __init__(self, filename, width, height, fps, queue_size=64):
         self.filename = filename
-        self.fourcc = cv2.VideoWriter_fourcc(*'MJPG') 
-        self.writer = cv2.VideoWriter(filename, self.fourcc, fps, (width, height))
-        
+        self.writer = None
+        self.gpu_writer = self._open_gpu_writer(filename, width, height, fps)
+        if self.gpu_writer is None:
+            self.fourcc = cv2.VideoWriter_fourcc(*'MJPG')
+            self.writer = cv2.VideoWriter(filename, self.fourcc, fps, (width, height))
+
+        self.dropped_frames = 0
+        self._write_q = queue.Queue(maxsize=queue_size)
+        self._running = True
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+    @staticmethod
+    def _open_gpu_writer(filename, width, height, fps):
+        """
+        尝试 NVENC 硬件编码 (cv2.cudacodec.createVideoWriter)
+        1080p@120 下 MJPG 软编会抢占采集线程 CPU, 硬编码可完全卸载
+        """
+        try:
+            if not hasattr(cv2, 'cudacodec'):
+                return None
+            writer = cv2.cudacodec.createVideoWriter(
+                filename, (width, height), cv2.cudacodec.HEVC, fps)
+            print("[Recorder] Using cudacodec (NVENC) hardware encode.")
+            return writer
+        except Exception as e:
+            print(f"[Recorder] GPU encode unavailable, using MJPG: {e}")
+            return None
+
     def write(self, frame):
-        if self.writer.isOpened():
+        """ 入队即返回, 实际编码在写盘线程中进行 """
+        try:
+            self._write_q.put_nowait(frame)
+        except queue.Full:
+            # 丢最旧的一帧给新帧腾位置
+            try:
+                self._write_q.get_nowait()
+                self.dropped_frames += 1
+            except queue.Empty:
+                pass
+            try:
+                self._write_q.put_nowait(frame)
+            except queue.Full:
+                self.dropped_frames += 1
+
+    def _writer_loop(self):
+        while self._running or not self._write_q.empty():
+            try:
+                frame = self._write_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._encode(frame)
+
+    def _encode(self, frame):
+        if self.gpu_writer is not None:
+            # cuda_GpuMat 可直接写入; numpy 帧由 cudacodec 内部上传
+            self.gpu_writer.write(frame)
+        elif self.writer is not None and self.writer.isOpened():
             self.writer.write(frame)
-            
+
     def release(self):
+        # 先停收新帧, 等写盘线程把队列清空
+        self._running = False
+        self._writer_thread.join(timeout=5.0)
+        if self.dropped_frames:
+            print(f"[Recorder] Dropped {self.dropped_frames} frames (writer queue overflow)")
+
+        if self.gpu_writer is not None:
+            self.gpu_writer.release()
+            self.gpu_writer = None
         if self.writer:
             self.writer.release()
+            self.writer = None
 
-class CaptureWorker(QThread):
+class CaptureWorker(QObject):
     """
-    采集线程：专注于从摄像头读取与写入磁盘 (Producer)
-    目标：1080p @ 120fps
+    录制订阅者：从共享 CameraSource 接帧并写入磁盘
+    采集循环由 CameraSource 统一承担, 预览/录制切换不再重新打开摄像头
     """
     frame_captured = Signal(object)
-    fps_updated = Signal(float) # 新增 FPS 信号
-    
+    fps_updated = Signal(float) # 转发 FPS 信号
+
     def __init__(self, camera_id=0, save_path=None):
         super().__init__()
         self.camera_id = camera_id
         self.save_path = save_path
-        self.is_running = False
+        self.source = None
         self.recorder = None
-        self.fps_real = 0
-
-    def run(self):
-        cap = cv2.VideoCapture(self.camera_id)
-        # 强制 MJPEG 以支持高帧率
-        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-        cap.set(cv2.CAP_PROP_FPS, 120)
-        
-        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        print(f"[Camera] Init: {w}x{h} @ {fps}fps")
-        
-        if self.save_path:
+
+    def start(self):
+        self.source = CameraSource.instance(self.camera_id)
+        # DirectConnection: 写盘在采集线程执行, 不经过 UI 事件循环
+        self.source.frame_captured.connect(self._on_frame, Qt.DirectConnection)
+        self.source.fps_updated.connect(self.fps_updated)
+        self.source.acquire()
+
+    def _on_frame(self, frame):
+        if self.save_path and self.recorder is None:
+            h, w = frame.shape[:2]
+            fps = self.source.fps or 120.0
             self.recorder = VideoRecorder(self.save_path, w, h, fps)
             print(f"[Camera] Recording video to {self.save_path}")
 
-        self.is_running = True
-        frame_count = 0
-        start_time = time.time()
-        last_fps_time = start_time
+        if self.recorder:
+            self.recorder.write(frame)
 
-        while self.is_running:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if self.recorder:
-                self.recorder.write(frame)
-            
-            self.frame_captured.emit(frame)
-            
-            frame_count += 1
-            
-            # 每 30 帧计算一次 FPS
-            if frame_count % 30 == 0:
-                now = time.time()
-                duration = now - last_fps_time
-                if duration > 0:
-                    self.fps_real = 30 / duration
-                    self.fps_updated.emit(self.fps_real)
-                last_fps_time = now
+        self.frame_captured.emit(frame)
 
+    def stop(self):
+        if self.source:
+            self.source.frame_captured.disconnect(self._on_frame)
+            self.source.fps_updated.disconnect(self.fps_updated)
+            self.source.release()
+            self.source = None
         if self.recorder:
             self.recorder.release()
-        cap.release()
-        print(f"[Camera] Stopped. Final FPS: {self.fps_real:.1f}")
-
-    def stop(self):
-        self.is_running = False
-        self.wait()
+            self.recorder = None
 
 class CameraThread(QObject):
     """
@@ -99,7 +145,9 @@ class CameraThread(QObject):
     """
     frame_received = Signal(QImage)
     eye_roi_received = Signal(QImage)
-    gaze_data_received = Signal(float, float, float)
+    # 整批发送 (n,3) 的 [timestamp, pitch, yaw] ndarray:
+    # 120Hz 下逐样本信号的 Qt 编组+槽调度开销可观, 批量后摊薄 batch 倍
+    gaze_data_received = Signal(object)
     fps_received = Signal(float) # 转发 FPS 信号
     
     def __init__(self, camera_id=0):
@@ -117,9 +165,20 @@ class CameraThread(QObject):
         
         self.ai_thread = threading.Thread(target=self._ai_loop, daemon=True)
         self.ai_running = False
-        
+
         self.data_recorder = None
 
+        # UI 显示缓冲 (复用, 避免每帧分配/拷贝); 仅用于尺寸稳定的主画面,
+        # ROI 裁剪尺寸逐帧抖动, 不满足缓冲环的固定尺寸前提
+        self._frame_pool = RgbFramePool()
+
+        # 运动门控: 眼部画面静止时跳过 SwinUNet 推理, 复用上次结果
+        self._motion_threshold = 2.0   # 降采样灰度图的平均绝对差阈值
+        self._force_infer_every = 10   # 每 N 帧强制推理一次, 防止漂移
+        self._prev_small = None
+        self._frames_since_infer = 0
+        self._cached_gaze = None
+
     def start(self, save_path=None):
         # 1. 启动视频采集
         self.capture_worker = CaptureWorker(self.camera_id, save_path)
@@ -158,42 +217,105 @@ class CameraThread(QObject):
         with self.processing_lock:
             self.latest_frame = frame
 
-    def _ai_loop(self):
+    def _should_skip_inference(self, eye_roi):
+        """
+        帧间运动门控: 比较降采样灰度 ROI 的平均绝对差,
+        静止 (临床录制中常见) 时跳过推理, 直接复用上次的 pitch/yaw
+        """
+        small = cv2.resize(cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY), (15, 9))
+        prev = self._prev_small
+        self._prev_small = small
+
+        if prev is None or self._cached_gaze is None:
+            skip = False
+        elif self._frames_since_infer >= self._force_infer_every:
+            skip = False
+        else:
+            skip = cv2.absdiff(prev, small).mean() < self._motion_threshold
+
+        if skip:
+            self._frames_since_infer += 1
+        else:
+            self._frames_since_infer = 0
+        return skip
+
+    def _take_latest_frame(self):
+        """ 取走最新一帧 (没有则返回 None) """
+        with self.processing_lock:
+            frame = self.latest_frame
+            self.latest_frame = None
+        return frame
+
+    def _ai_loop(self, max_batch=4, batch_budget=0.005):
         start_time = time.time()
-        
+
         while self.ai_running:
-            frame = None
-            with self.processing_lock:
-                if self.latest_frame is not None:
-                    frame = self.latest_frame.copy()
-                    self.latest_frame = None
-            
+            # 1. 等待第一帧
+            frame = self._take_latest_frame()
             if frame is None:
                 time.sleep(0.001)
                 continue
-                
-            timestamp = time.time() - start_time
-            
-            # AI Pipeline
-            results, eye_roi = self.extractor.process(frame)
-            
-            pitch, yaw = 0.0, 0.0
-            if eye_roi is not None:
-                pitch, yaw = self.estimator.predict(eye_roi)
-                
-                rgb_roi = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_roi.shape
-                qt_roi = QImage(rgb_roi.data, w, h, ch * w, QImage.Format_RGB888)
-                self.eye_roi_received.emit(qt_roi.copy())
-            
-            # 记录数据
-            if self.data_recorder:
-                self.data_recorder.write(timestamp, pitch, yaw)
-            
-            self.gaze_data_received.emit(timestamp, pitch, yaw)
-            
-            # UI Display
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_frame.shape
-            qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888)
-            self.frame_received.emit(qt_image.copy())
+
+            batch = [(time.time() - start_time, frame.copy())]
+
+            # 2. 在时间预算内继续攒帧, 组成小 batch 一次性推理
+            deadline = time.monotonic() + batch_budget
+            while self.ai_running and len(batch) < max_batch and time.monotonic() < deadline:
+                frame = self._take_latest_frame()
+                if frame is None:
+                    time.sleep(0.001)
+                    continue
+                batch.append((time.time() - start_time, frame.copy()))
+
+            # 3. 提取眼部 ROI
+            rois = []
+            roi_index = [] # batch 内有 ROI 的帧下标
+            for i, (_, f) in enumerate(batch):
+                results, eye_roi = self.extractor.process(f)
+                if eye_roi is not None:
+                    rois.append(eye_roi)
+                    roi_index.append(i)
+
+            # 4. 运动门控 + 单次批量前向
+            gazes = {}
+            if rois:
+                infer_rois = []
+                infer_pos = []
+                for k, roi in enumerate(rois):
+                    if self._should_skip_inference(roi):
+                        gazes[roi_index[k]] = self._cached_gaze
+                    else:
+                        infer_rois.append(roi)
+                        infer_pos.append(k)
+
+                if infer_rois:
+                    for k, gaze in zip(infer_pos, self.estimator.predict_batch(infer_rois)):
+                        gazes[roi_index[k]] = gaze
+                        self._cached_gaze = gaze
+
+            # 5. 按帧序整理结果, 整批一次发出
+            samples = np.empty((len(batch), 3))
+            for i, (timestamp, f) in enumerate(batch):
+                pitch, yaw = gazes.get(i, (0.0, 0.0))
+
+                if i in gazes:
+                    # ROI 尺寸逐帧变化, 且一个 batch 最多排队 4 张:
+                    # 缓冲环会让在途 QImage 指向被覆盖/重分配的内存,
+                    # ROI 很小, copy() 让 QImage 自己持有数据最稳妥
+                    eye_roi = rois[roi_index.index(i)]
+                    rgb = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2RGB)
+                    rh, rw = rgb.shape[:2]
+                    self.eye_roi_received.emit(
+                        QImage(rgb.data, rw, rh, 3 * rw, QImage.Format_RGB888).copy())
+
+                # 记录数据
+                if self.data_recorder:
+                    self.data_recorder.write(timestamp, pitch, yaw)
+
+                samples[i] = (timestamp, pitch, yaw)
+
+            self.gaze_data_received.emit(samples)
+
+            # UI Display (只显示 batch 中最后一帧, 画面无需逐帧刷新)
+            _, last_frame = batch[-1]
+            self.frame_received.emit(self._frame_pool.to_qimage(last_frame))
@@ -0,0 +1,9 @@
+import re
+
+# 文件名净化: 保留字母/数字/下划线 (\w, 含中文等 Unicode 文字)、空格和连字符
+# 预编译一次, 录制和分析两侧共用同一规则, 保证目录名一致
+_SAFE_RE = re.compile(r'[^\w \-]+', re.UNICODE)
+
+def safe_name(name):
+    """ 把患者姓名转成可安全用作目录名的形式 """
+    return _SAFE_RE.sub('', name).strip()
@@ -1,80 +1,101 @@
 import cv2
 import time
 import threading
-from PySide6.QtCore import QThread, Signal
+import numpy as np
+from PySide6.QtCore import Qt, QThread, Signal, QObject
 from PySide6.QtGui import QImage
 
-class PreviewThread(QThread):
+from app.core.source import CameraSource
+
+class RgbFramePool:
+    """
+    预分配的 RGB 帧缓冲环
+    复用固定几块缓冲承载 BGR->RGB 转换结果, QImage 直接引用缓冲内存,
+    省掉每帧 .copy() (1080p120 下约 750 MB/s 的冗余拷贝)
+    缓冲环深度 3 足以覆盖跨线程信号排队期间的生存期
+    """
+    def __init__(self, size=3):
+        self.size = size
+        self.buffers = None
+        self.index = 0
+        # 尺寸变化时旧缓冲可能仍被排队中的 QImage 引用,
+        # 保留一代再释放, 防止非持有内存的 QImage 指向已回收的数组
+        self._retired = None
+
+    def to_qimage(self, bgr_frame):
+        h, w = bgr_frame.shape[:2]
+        if self.buffers is None or self.buffers[0].shape[0] != h or self.buffers[0].shape[1] != w:
+            self._retired = self.buffers
+            self.buffers = [np.empty((h, w, 3), np.uint8) for _ in range(self.size)]
+            self.index = 0
+        buf = self.buffers[self.index]
+        self.index = (self.index + 1) % self.size
+        cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB, dst=buf)
+        return QImage(buf.data, w, h, 3 * w, QImage.Format_RGB888)
+
+class PreviewThread(QObject):
     """
-    预览线程：只显示画面，不录制，不推理
+    预览订阅者：只显示画面，不录制，不推理
     用于在检查前调整摄像头位置
+    帧来自共享 CameraSource, 预览和正式检查之间切换不再重新打开摄像头
     """
     frame_received = Signal(QImage)
     fps_updated = Signal(float)
-    
+
     def __init__(self, camera_id=0):
         super().__init__()
         self.camera_id = camera_id
         self.is_running = False
+        self.source = None
+        # UI 显示缓冲: 预览缩放到 960x540, 界面上也显示不了更多像素
+        self._display_size = (960, 540)
+        self._small = None
+        self._pool = RgbFramePool()
 
-    def run(self):
-        cap = cv2.VideoCapture(self.camera_id)
-        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-        cap.set(cv2.CAP_PROP_FPS, 120)
-        
-        if not cap.isOpened():
-            print(f"[Preview] Cannot open camera {self.camera_id}")
-            return
-            
-        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        print(f"[Preview] Camera {self.camera_id}: {w}x{h} @ {fps}fps")
-        
+    def start(self):
+        self.source = CameraSource.instance(self.camera_id)
+        # DirectConnection: 缩放/转换在采集线程执行, 只把 QImage 排队给 UI
+        self.source.frame_captured.connect(self._on_frame, Qt.DirectConnection)
+        self.source.fps_updated.connect(self.fps_updated)
+        self.source.acquire()
         self.is_running = True
-        frame_count = 0
-        start_time = time.time()
-        last_fps_time = start_time
 
-        while self.is_running:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # 只发送画面，不做其他处理
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h_frame, w_frame, ch = rgb_frame.shape
-            qt_image = QImage(rgb_frame.data, w_frame, h_frame, ch * w_frame, QImage.Format_RGB888)
-            self.frame_received.emit(qt_image.copy())
-            
-            frame_count += 1
-            if frame_count % 30 == 0:
-                now = time.time()
-                duration = now - last_fps_time
-                if duration > 0:
-                    fps_real = 30 / duration
-                    self.fps_updated.emit(fps_real)
-                last_fps_time = now
-
-        cap.release()
-        print(f"[Preview] Stopped")
+    def _on_frame(self, frame):
+        # 只发送画面，不做其他处理 (缩小 + 复用缓冲, 不做 .copy())
+        if self._small is None:
+            self._small = np.empty((self._display_size[1], self._display_size[0], 3), np.uint8)
+        cv2.resize(frame, self._display_size, dst=self._small)
+        self.frame_received.emit(self._pool.to_qimage(self._small))
 
     def stop(self):
         self.is_running = False
-        self.wait()
+        if self.source:
+            self.source.frame_captured.disconnect(self._on_frame)
+            self.source.fps_updated.disconnect(self.fps_updated)
+            self.source.release()
+            self.source = None
+        print(f"[Preview] Stopped")
 
-def enumerate_cameras(max_check=5):
+# 枚举结果进程级缓存: 每个 id 的探测要真实打开/关闭设备,
+# 单次可达数百毫秒, 一次会话内摄像头集合几乎不会变
+_camera_cache = None
+
+def enumerate_cameras(max_check=5, refresh=False):
     """
     扫描系统中所有可用的摄像头
-    返回可用的摄像头 ID 列表
+    返回可用的摄像头 ID 列表 (结果缓存, refresh=True 强制重扫)
     """
+    global _camera_cache
+    if _camera_cache is not None and not refresh:
+        return _camera_cache
+
     available = []
     for i in range(max_check):
         cap = cv2.VideoCapture(i)
         if cap.isOpened():
             available.append(i)
             cap.release()
+
+    _camera_cache = available
     return available
 
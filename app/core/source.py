@@ -0,0 +1,159 @@
+import cv2
+import time
+from PySide6.QtCore import QThread, Signal
+
+# OpenCV 全局调优: 启用 IPP/SIMD 优化路径; 限制为单线程,
+# 避免与 MediaPipe / Torch 的线程池互相争核 (过度订阅反而变慢)
+# 放在采集模块里, 随首次用到摄像头时加载, 不拖慢程序启动
+cv2.setUseOptimized(True)
+cv2.setNumThreads(1)
+
+class CameraSource(QThread):
+    """
+    共享摄像头源 (单一 Producer)
+    预览与正式检查各自 open/close 摄像头会触发 MJPG/1080p/120 重新协商,
+    切换时停顿数百毫秒。这里统一由一个采集循环读取, 通过信号多播给
+    任意数量的订阅者 (预览 / 录制 / AI), 帧以 ndarray 引用发送不做拷贝,
+    订阅者如需修改必须自行 .copy()
+    """
+    frame_captured = Signal(object)
+    fps_updated = Signal(float)
+
+    _instances = {}
+
+    def __init__(self, camera_id=0, use_gpu_decode=True):
+        super().__init__()
+        self.camera_id = camera_id
+        self.use_gpu_decode = use_gpu_decode
+        self.is_running = False
+        self._refcount = 0
+
+        # 打开后填充的实际参数
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.fps_real = 0
+
+    @classmethod
+    def instance(cls, camera_id=0):
+        """ 按摄像头 ID 取共享实例 """
+        src = cls._instances.get(camera_id)
+        if src is None:
+            src = cls(camera_id)
+            cls._instances[camera_id] = src
+        return src
+
+    def acquire(self):
+        """ 订阅者引用计数 +1, 首个订阅者启动采集线程 """
+        self._refcount += 1
+        if not self.isRunning():
+            self.start()
+
+    def release(self):
+        """ 订阅者引用计数 -1, 无订阅者时停止采集 """
+        self._refcount = max(0, self._refcount - 1)
+        if self._refcount == 0 and self.isRunning():
+            self.is_running = False
+            self.wait()
+
+    def _open_gpu_reader(self):
+        """
+        尝试用 NVDEC (cv2.cudacodec) 做硬件 MJPEG 解码, 把 JPEG 解码搬出 CPU
+        采集线程。无 CUDA 版 OpenCV 或打开失败时返回 None, 回退 CPU 路径。
+        """
+        if not self.use_gpu_decode:
+            return None
+        try:
+            if not hasattr(cv2, 'cudacodec'):
+                return None
+            reader = cv2.cudacodec.createVideoReader(str(self.camera_id))
+            print("[CameraSource] Using cudacodec (NVDEC) hardware decode.")
+            return reader
+        except Exception as e:
+            print(f"[CameraSource] GPU decode unavailable, falling back to CPU: {e}")
+            return None
+
+    def run(self):
+        gpu_reader = self._open_gpu_reader()
+        if gpu_reader is not None:
+            self._run_gpu(gpu_reader)
+            return
+
+        cap = cv2.VideoCapture(self.camera_id)
+        # 强制 MJPEG 以支持高帧率
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+        cap.set(cv2.CAP_PROP_FPS, 120)
+
+        if not cap.isOpened():
+            print(f"[CameraSource] Cannot open camera {self.camera_id}")
+            return
+
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        print(f"[CameraSource] Init: {self.width}x{self.height} @ {self.fps}fps")
+
+        self.is_running = True
+        frame_count = 0
+        last_fps_time = time.time()
+
+        while self.is_running:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            self.frame_captured.emit(frame)
+
+            frame_count += 1
+            # 每 30 帧计算一次 FPS
+            if frame_count % 30 == 0:
+                now = time.time()
+                duration = now - last_fps_time
+                if duration > 0:
+                    self.fps_real = 30 / duration
+                    self.fps_updated.emit(self.fps_real)
+                last_fps_time = now
+
+        cap.release()
+        print(f"[CameraSource] Stopped. Final FPS: {self.fps_real:.1f}")
+
+    def _run_gpu(self, reader):
+        """
+        GPU 解码采集循环: NVDEC 解码 -> GPU 上 BGRA->BGR -> 下载一次供
+        订阅者消费 (录制/MediaPipe 均为 CPU 接口, 仍省掉了 CPU JPEG 解码)
+        """
+        self.fps = 120.0
+        first_frame = True
+
+        self.is_running = True
+        frame_count = 0
+        last_fps_time = time.time()
+
+        while self.is_running:
+            ret, gpu_frame = reader.nextFrame()
+            if not ret or gpu_frame is None:
+                break
+
+            # cudacodec 输出 BGRA, 在 GPU 上转 BGR 后下载
+            gpu_bgr = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR)
+            frame = gpu_bgr.download()
+
+            if first_frame:
+                self.height, self.width = frame.shape[:2]
+                print(f"[CameraSource] GPU Init: {self.width}x{self.height}")
+                first_frame = False
+
+            self.frame_captured.emit(frame)
+
+            frame_count += 1
+            if frame_count % 30 == 0:
+                now = time.time()
+                duration = now - last_fps_time
+                if duration > 0:
+                    self.fps_real = 30 / duration
+                    self.fps_updated.emit(self.fps_real)
+                last_fps_time = now
+
+        print(f"[CameraSource] Stopped (GPU). Final FPS: {self.fps_real:.1f}")
@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 import os
+import threading
 
 # 定义数据库文件路径
 DB_PATH = "vestibular_data.db"
@@ -11,17 +13,46 @@ Base = declarative_base()
 
 class DatabaseManager:
     _instance = None
-    
+    _instance_lock = threading.Lock()
+
     def __new__(cls):
+        # 双重检查锁: 常规路径无锁, 只有首次创建时加锁,
+        # 防止两个工作线程同时初始化出两个 engine
         if cls._instance is None:
-            cls._instance = super(DatabaseManager, cls).__new__(cls)
-            cls._instance._init_db()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(DatabaseManager, cls).__new__(cls)
+                    instance._init_db()
+                    cls._instance = instance
         return cls._instance
     
     def _init_db(self):
         # 使用 SQLite
-        self.engine = create_engine(f"sqlite:///{DB_PATH}", echo=False)
-        
+        # check_same_thread=False: 连接可能跨 Qt 工作线程使用, 由会话层保证串行
+        # StaticPool: 整个进程复用同一条连接, 省掉每次会话的打开/PRAGMA 开销,
+        # 也保证 WAL 等 PRAGMA 只需设置一次
+        self.engine = create_engine(
+            f"sqlite:///{DB_PATH}",
+            echo=False,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+
+        # 每个新连接上设置 PRAGMA:
+        # WAL 让读写不再互相阻塞 (UI 查询不会被录制结束时的写入卡住),
+        # synchronous=NORMAL 在 WAL 下安全且大幅减少 fsync,
+        # 临时表放内存、页缓存放大到 64MB
+        @event.listens_for(self.engine, "connect")
+        def _set_sqlite_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON") # SQLite 默认不启用外键级联
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-64000")
+            cursor.close()
+
+
         # 创建会话工厂
         self.Session = scoped_session(sessionmaker(bind=self.engine))
         
@@ -32,9 +63,55 @@ class DatabaseManager:
         # 创建表 (如果不存在)
         Base.metadata.create_all(self.engine)
 
+        # create_all 只建新表, 不会给已存在的表补索引:
+        # 老库上显式建一遍 (checkfirst 幂等, 已有则跳过),
+        # 否则升级安装拿不到 ix_patients_name / ix_exam_patient_date
+        for table in (Patient.__table__, ExamRecord.__table__):
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+
+        # 患者查询缓存: patient_id -> Patient
+        # 检查流程中会按病历号反复查同一位患者, 缓存后只打一次数据库
+        self._patient_cache = {}
+
     def get_session(self):
         return self.Session()
-        
+
+    def bulk_insert(self, objs):
+        """
+        批量插入 ORM 对象, 单事务提交
+        逐条 add+commit 每次都要走一遍 fsync/WAL checkpoint,
+        合并成一个事务后 N 条插入只付一次提交成本
+        用独立短会话而不是线程级 scoped session: 调用线程的长会话
+        往往已有自动开启的事务, 在其上再 begin() 会直接报错
+        """
+        session = self.Session.session_factory()
+        try:
+            with session.begin():
+                session.add_all(objs)
+        finally:
+            session.close()
+
+    def get_patient(self, patient_id):
+        """
+        按病历号查询患者 (带缓存)
+        未命中时查库并缓存; 增删患者后需调用 invalidate_patient_cache()
+        """
+        patient = self._patient_cache.get(patient_id)
+        if patient is not None:
+            return patient
+
+        from app.database.models import Patient
+        patient = self.Session().query(Patient).filter_by(patient_id=patient_id).first()
+        if patient is not None:
+            self._patient_cache[patient_id] = patient
+        return patient
+
+    def invalidate_patient_cache(self):
+        """ 患者数据变更 (新增/删除/编辑) 后清空缓存 """
+        self._patient_cache.clear()
+
+
     def close(self):
         self.Session.remove()
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.database.db_manager import Base
 
@@ -9,14 +9,18 @@ class Patient(Base):
 
     id = Column(Integer, primary_key=True)
     patient_id = Column(String(50), unique=True, nullable=False, comment="医院病历号/身份证号")
-    name = Column(String(100), nullable=False)
+    # name 建索引支持患者搜索的前缀匹配; patient_id 的 unique 约束已自带索引
+    name = Column(String(100), nullable=False, index=True)
     gender = Column(String(10), nullable=True) # 'M', 'F'
     birth_date = Column(DateTime, nullable=True)
     phone = Column(String(20), nullable=True)
     created_at = Column(DateTime, default=datetime.now)
     
     # 关联检查记录 (一对多)
-    records = relationship("ExamRecord", back_populates="patient", cascade="all, delete-orphan")
+    # passive_deletes: 删除患者时不再逐条加载/删除记录 (N+1),
+    # 由数据库按外键的 ON DELETE CASCADE 一条语句级联完成
+    records = relationship("ExamRecord", back_populates="patient",
+                           cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Patient(name={self.name}, id={self.patient_id})>"
@@ -25,8 +29,15 @@ class ExamRecord(Base):
     """ 检查记录表 (每次检查生成一条) """
     __tablename__ = 'exam_records'
 
+    # 覆盖最常见的查询: "某患者的检查记录按日期排序"
+    # 复合索引让 SQLite 直接按索引顺序输出, 免去全表扫描+临时排序
+    # (patients.patient_id 的 unique 约束本身已自带索引, 无需重复建)
+    __table_args__ = (
+        Index('ix_exam_patient_date', 'patient_pk', 'exam_date'),
+    )
+
     id = Column(Integer, primary_key=True)
-    patient_pk = Column(Integer, ForeignKey('patients.id'), nullable=False)
+    patient_pk = Column(Integer, ForeignKey('patients.id', ondelete="CASCADE"), nullable=False)
     
     exam_date = Column(DateTime, default=datetime.now)
     video_path = Column(String(255), nullable=True, comment="原始视频文件路径")
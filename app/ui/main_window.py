@@ -1,24 +1,55 @@
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
 from qfluentwidgets import FluentWindow, NavigationItemPosition, FluentIcon, InfoBar
 
 from app.ui.views.patient_manager import PatientManagerInterface
-from app.ui.views.nystagmus_module import SpontaneousNystagmusModule
+
+class _LazyPage(QWidget):
+    """
+    惰性页面容器: 首次显示时才调用工厂构建真正的页面
+    重依赖 (cv2 / pyqtgraph / numpy) 的 import 随之推迟,
+    主窗口可以在它们加载前先显示出来
+    """
+    def __init__(self, factory, object_name, parent=None):
+        super().__init__(parent=parent)
+        self.setObjectName(object_name)
+        self._factory = factory
+        self._page = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def page(self):
+        """ 返回真正的页面, 未构建则先构建 """
+        if self._page is None:
+            self._page = self._factory(self)
+            self._layout.addWidget(self._page)
+        return self._page
+
+    def showEvent(self, event):
+        self.page()
+        super().showEvent(event)
+
+def _create_nystagmus_module(parent):
+    # 延迟导入: 该模块链上挂着 cv2 (CameraThread) 与 pyqtgraph (波形图)
+    from app.ui.views.nystagmus_module import SpontaneousNystagmusModule
+    return SpontaneousNystagmusModule(parent)
 
 class MainWindow(FluentWindow):
     """ 主窗口框架 """
     def __init__(self):
         super().__init__()
-        
+
         self.setWindowTitle("VestibularScoper - 前庭功能检查系统")
         self.resize(1200, 800)
-        
+
         # 1. 创建子界面
+        # 患者管理是落地页, 立即构建; 眼震模块首次切入时才构建
         self.home_interface = PatientManagerInterface(self)
-        self.nystagmus_module = SpontaneousNystagmusModule(self)
-        
+        self.nystagmus_page = _LazyPage(_create_nystagmus_module,
+                                        "SpontaneousNystagmusModule", self)
+
         # 2. 初始化导航栏
         self.init_navigation()
-        
+
         # 3. 信号连接
         self.home_interface.patient_selected.connect(self.on_patient_selected)
 
@@ -30,10 +61,10 @@ class MainWindow(FluentWindow):
             "患者管理",
             NavigationItemPosition.TOP
         )
-        
+
         # 自发眼震模块 (包含检查+分析)
         self.addSubInterface(
-            self.nystagmus_module,
+            self.nystagmus_page,
             FluentIcon.VIDEO,
             "自发眼震",
             NavigationItemPosition.TOP
@@ -41,11 +72,11 @@ class MainWindow(FluentWindow):
 
     def on_patient_selected(self, patient_id, patient_name):
         """ 选中患者后，同步更新相关页面 """
-        self.nystagmus_module.set_current_patient(patient_id, patient_name)
-        
+        self.nystagmus_page.page().set_current_patient(patient_id, patient_name)
+
         # 跳转到眼震模块
-        self.switchTo(self.nystagmus_module)
-        
+        self.switchTo(self.nystagmus_page)
+
         InfoBar.info(
             title='就绪',
             content=f"当前患者: {patient_name}",
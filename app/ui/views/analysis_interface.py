@@ -1,100 +1,262 @@
 import os
-import glob
-import pandas as pd
+import hashlib
 import numpy as np
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QSplitter, QScrollArea, QFrame)
-from PySide6.QtCore import Qt, Signal, Slot, QThread, QSize
-from qfluentwidgets import (SubtitleLabel, PushButton, FluentIcon, CardWidget, 
-                            InfoBar, ComboBox, MessageBox, TransparentToolButton, 
-                            BodyLabel, StrongBodyLabel)
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QSplitter, QFrame, QListView, QStyle,
+                               QStyledItemDelegate)
+from PySide6.QtCore import (Qt, Signal, Slot, QObject, QRunnable, QThreadPool,
+                            QSize, QRect, QEvent, QModelIndex, QAbstractListModel)
+from PySide6.QtGui import QPainter, QColor
+from qfluentwidgets import (SubtitleLabel, PushButton, FluentIcon,
+                            InfoBar, ComboBox, MessageBox,
+                            BodyLabel)
 import pyqtgraph as pg
 
+# 全局绘图配置: OpenGL 走 GPU 渲染长曲线, 关抗锯齿省一半以上的描线时间
+pg.setConfigOptions(useOpenGL=True, antialias=False)
+
+# 可选的 CSV 加速解析器 (均非硬依赖, 见 requirements.txt 注释):
+# pyarrow 的多线程 C++ 解析器比 loadtxt 快一个量级;
+# fastcsv 用 SIMD 做分隔符扫描, 作为次选; 都没有时退回 numpy 路径
+try:
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+try:
+    import fastcsv
+except ImportError:
+    fastcsv = None
+
+from app.core.naming import safe_name
+
+# 同患者列表: 删除图标只解码一次, 卡片重绘时直接复用
+_DELETE_ICON = FluentIcon.DELETE.icon()
 from app.core.algorithm.signal import (signal_preprocess, find_turning_points, 
                                        calculate_slopes, identify_nystagmus_patterns)
 
-class RecordCard(CardWidget):
-    """ 记录卡片组件 """
+class RecordListModel(QAbstractListModel):
+    """
+    记录列表数据模型
+    只持有 (csv_path, test_type, filename) 元组, 卡片外观由 delegate 绘制;
+    QListView 只为可见行调用 data()/paint(), 记录数量不再影响界面开销
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self._records = list(records)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._records[index.row()]
+        if role == Qt.UserRole:
+            return record
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return record[2] # filename
+        return None
+
+class RecordCardDelegate(QStyledItemDelegate):
+    """
+    把一行记录画成卡片 (类型标签 + 文件名 + 删除按钮)
+    替代原先每条记录一个 RecordCard 子控件的做法
+    """
     clicked = Signal(str)
     delete_requested = Signal(str)
-    
-    def __init__(self, csv_path, test_type, filename, parent=None):
-        super().__init__(parent)
-        self.csv_path = csv_path
-        
-        # 设置合理的尺寸
-        self.setMinimumHeight(100)
-        self.setMaximumHeight(120)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(12, 12, 12, 12)
-        layout.setSpacing(8)
-        
-        # 顶部：类型标签
-        self.type_label = BodyLabel(f"[{test_type}]", self)
-        self.type_label.setStyleSheet("color: #0078D4; font-weight: bold;")
-        
-        # 文件名（截断过长文件名）
-        display_name = filename if len(filename) < 25 else filename[:22] + "..."
-        self.name_label = StrongBodyLabel(display_name, self)
-        self.name_label.setToolTip(filename)
-        
-        # 底部：操作按钮
-        bottom_layout = QHBoxLayout()
-        bottom_layout.setSpacing(8)
-        
-        self.btn_view = PushButton("查看", self)
-        self.btn_view.setFixedHeight(32)
-        self.btn_view.clicked.connect(lambda: self.clicked.emit(self.csv_path))
-        
-        self.btn_delete = TransparentToolButton(FluentIcon.DELETE, self)
-        self.btn_delete.setToolTip("删除")
-        self.btn_delete.clicked.connect(lambda: self.delete_requested.emit(self.csv_path))
-        
-        bottom_layout.addWidget(self.btn_view, 1)
-        bottom_layout.addWidget(self.btn_delete)
-        
-        layout.addWidget(self.type_label)
-        layout.addWidget(self.name_label)
-        layout.addStretch(1)
-        layout.addLayout(bottom_layout)
-        
-        # 鼠标悬停效果
-        self.setCursor(Qt.PointingHandCursor)
 
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.clicked.emit(self.csv_path)
-        super().mousePressEvent(event)
+    CARD_HEIGHT = 88
+    MARGIN = 4
+    DELETE_SIZE = 20
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT)
+
+    def _card_rect(self, option_rect):
+        m = self.MARGIN
+        return option_rect.adjusted(m, m, -m, -m)
+
+    def _delete_rect(self, card_rect):
+        s = self.DELETE_SIZE
+        return QRect(card_rect.right() - s - 10, card_rect.bottom() - s - 10, s, s)
+
+    def paint(self, painter, option, index):
+        csv_path, test_type, filename = index.data(Qt.UserRole)
+        card = self._card_rect(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # 卡片底色 (悬停/选中高亮)
+        painter.setPen(Qt.NoPen)
+        if option.state & (QStyle.State_Selected | QStyle.State_MouseOver):
+            painter.setBrush(QColor(232, 242, 252))
+        else:
+            painter.setBrush(QColor(248, 248, 248))
+        painter.drawRoundedRect(card, 8, 8)
+
+        # 类型标签
+        font = painter.font()
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#0078D4"))
+        painter.drawText(card.adjusted(12, 10, -12, 0),
+                         Qt.AlignLeft | Qt.AlignTop, f"[{test_type}]")
+
+        # 文件名 (超宽时省略)
+        font.setBold(False)
+        painter.setFont(font)
+        painter.setPen(QColor(40, 40, 40))
+        metrics = painter.fontMetrics()
+        name = metrics.elidedText(filename, Qt.ElideMiddle, card.width() - 24)
+        painter.drawText(card.adjusted(12, 34, -12, 0),
+                         Qt.AlignLeft | Qt.AlignTop, name)
+
+        # 删除按钮
+        _DELETE_ICON.paint(painter, self._delete_rect(card))
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            csv_path = index.data(Qt.UserRole)[0]
+            if self._delete_rect(self._card_rect(option.rect)).contains(event.pos()):
+                self.delete_requested.emit(csv_path)
+            else:
+                self.clicked.emit(csv_path)
+            return True
+        return False
 
-class AnalysisWorker(QThread):
-    """ 离线分析线程 """
+def load_recording(csv_path):
+    """
+    读取记录文件, 返回 (timestamps, pitch, yaw) 三个 float32 数组
+    优先 pyarrow, 否则 np.loadtxt
+    """
+    if pa_csv is not None:
+        table = pa_csv.read_csv(csv_path)
+        return (table['Timestamp'].to_numpy().astype(np.float32, copy=False),
+                table['Pitch'].to_numpy().astype(np.float32, copy=False),
+                table['Yaw'].to_numpy().astype(np.float32, copy=False))
+
+    if fastcsv is not None:
+        rows = np.array([row for row in fastcsv.mmap_reader(csv_path)][1:],
+                        dtype=np.float32)
+        return rows[:, 0], rows[:, 1], rows[:, 2]
+
+    return np.loadtxt(csv_path, delimiter=',', skiprows=1,
+                      unpack=True, dtype=np.float32)
+
+class AnalysisSignals(QObject):
+    """ QRunnable 本身不能带信号, 用独立 QObject 承载 """
     finished = Signal(dict)
     error = Signal(str)
-    
+
+class AnalysisWorker(QRunnable):
+    """
+    离线分析任务
+    提交到全局 QThreadPool 执行, 复用池内线程,
+    免去每次分析创建/销毁一条 QThread 的开销
+    """
+    # 分析结果磁盘缓存目录; 键含文件 mtime/size, 参数改动时需更新 PARAMS_TAG
+    CACHE_DIR = os.path.join("Data", ".analysis_cache")
+    PARAMS_TAG = "hp0.1-lp6.0-o5-cascade-x10-t0.3:0.8-r1.4:8.0"
+
     def __init__(self, csv_path, axis='horizontal'):
         super().__init__()
         self.csv_path = csv_path
         self.axis = axis
-    
+        self.signals = AnalysisSignals()
+        # QRunnable 没有 requestInterruption, 用自有标志实现取消
+        self._cancelled = False
+        # 界面持有引用并可能在 run 结束后调用 cancel(), 关闭池的自动回收
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _cache_path(self):
+        """ 由 源文件mtime|size|分析轴|参数 派生缓存文件名 """
+        st = os.stat(self.csv_path)
+        key = f"{os.path.abspath(self.csv_path)}|{st.st_mtime_ns}|{st.st_size}|{self.axis}|{self.PARAMS_TAG}"
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.CACHE_DIR, digest + ".npz")
+
+    def _load_cached(self, cache_path):
+        data = np.load(cache_path, allow_pickle=True)
+        return {
+            'timestamps': data['timestamps'],
+            'eye_angles': data['eye_angles'],
+            'filtered_signal': data['filtered_signal'],
+            'time': data['time'],
+            'turning_points': data['turning_points'],
+            'patterns': list(data['patterns']),
+            'direction': str(data['direction']),
+            'spv': float(data['spv']),
+            'cv': float(data['cv']),
+            'axis': self.axis,
+        }
+
+    def _save_cache(self, cache_path, result):
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        np.savez_compressed(
+            cache_path,
+            timestamps=result['timestamps'],
+            eye_angles=result['eye_angles'],
+            filtered_signal=result['filtered_signal'],
+            time=result['time'],
+            turning_points=result['turning_points'],
+            patterns=np.array(result['patterns'], dtype=object),
+            direction=result['direction'],
+            spv=result['spv'],
+            cv=result['cv'],
+        )
+
     def run(self):
         try:
-            df = pd.read_csv(self.csv_path)
-            timestamps = df['Timestamp'].values
-            pitch_data = df['Pitch'].values
-            yaw_data = df['Yaw'].values
-            
+            # 命中磁盘缓存则跳过整条分析管线 (同一记录反复切换查看时常见)
+            cache_path = self._cache_path()
+            if os.path.exists(cache_path):
+                try:
+                    self.signals.finished.emit(self._load_cached(cache_path))
+                    return
+                except Exception as e:
+                    print(f"[Analysis] Cache read failed, re-analyzing: {e}")
+
+            # 记录文件是固定三列纯数值 (Timestamp,Pitch,Yaw)
+            timestamps, pitch_data, yaw_data = load_recording(self.csv_path)
+
             eye_angles = yaw_data if self.axis == 'horizontal' else pitch_data
-            
+
+            if self._cancelled:
+                return
+
             filtered_signal, time = signal_preprocess(
                 timestamps, eye_angles,
                 highpass_parameter={'cutoff': 0.1, 'fs': 60, 'order': 5},
                 lowpass_parameter={'cutoff': 6.0, 'fs': 60, 'order': 5},
                 interpolate_ratio=10
             )
-            
+
+            # scipy 滤波输出 float64; 降到 float32 后绘图/缓存的数据量减半,
+            # 对度级角度信号精度绰绰有余
+            filtered_signal = filtered_signal.astype(np.float32, copy=False)
+            time = time.astype(np.float32, copy=False)
+
+            if self._cancelled:
+                return
+
             turning_points = find_turning_points(filtered_signal, prominence=0.1, distance=150)
             slope_times, slopes = calculate_slopes(time, filtered_signal, turning_points)
+
+            if self._cancelled:
+                return
+
             patterns, _, direction, pattern_spv, cv = identify_nystagmus_patterns(
                 filtered_signal, time,
                 min_time=0.3, max_time=0.8,
@@ -114,11 +276,19 @@ class AnalysisWorker(QThread):
                 'cv': cv,
                 'axis': self.axis
             }
-            
-            self.finished.emit(result)
-            
+
+            try:
+                self._save_cache(cache_path, result)
+            except Exception as e:
+                print(f"[Analysis] Cache write failed: {e}")
+
+            if self._cancelled:
+                return
+
+            self.signals.finished.emit(result)
+
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 class AnalysisInterface(QWidget):
     """ 数据管理与分析界面 """
@@ -144,28 +314,36 @@ class AnalysisInterface(QWidget):
         title_layout = QHBoxLayout()
         self.title_label = SubtitleLabel("检查记录", left_panel)
         self.btn_refresh = PushButton(FluentIcon.SYNC, "刷新", left_panel)
-        self.btn_refresh.clicked.connect(self.load_records)
+        self.btn_refresh.clicked.connect(lambda: self.load_records(force=True))
         title_layout.addWidget(self.title_label)
         title_layout.addStretch(1)
         title_layout.addWidget(self.btn_refresh)
         
-        # 滚动区域
-        scroll_area = QScrollArea(left_panel)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setFrameShape(QFrame.NoFrame)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("QScrollArea { background: transparent; border: none; }")
-        
-        scroll_widget = QWidget()
-        self.card_layout = QVBoxLayout(scroll_widget)
-        self.card_layout.setSpacing(12)
-        self.card_layout.setContentsMargins(0, 0, 0, 0)
-        self.card_layout.setAlignment(Qt.AlignTop)
-        
-        scroll_area.setWidget(scroll_widget)
-        
+        # 虚拟化列表: 模型 + 卡片 delegate, 只渲染可见行
+        self.record_model = RecordListModel(self)
+        self.record_delegate = RecordCardDelegate(self)
+        self.record_delegate.clicked.connect(self.on_record_selected)
+        self.record_delegate.delete_requested.connect(self.delete_record)
+
+        self.record_view = QListView(left_panel)
+        self.record_view.setModel(self.record_model)
+        self.record_view.setItemDelegate(self.record_delegate)
+        self.record_view.setUniformItemSizes(True)
+        self.record_view.setMouseTracking(True)
+        self.record_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.record_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.record_view.setFrameShape(QFrame.NoFrame)
+        self.record_view.setStyleSheet("QListView { background: transparent; border: none; }")
+
+        # 空列表提示
+        self.records_placeholder = BodyLabel("", left_panel)
+        self.records_placeholder.setAlignment(Qt.AlignCenter)
+        self.records_placeholder.setStyleSheet("color: gray; padding: 30px;")
+        self.records_placeholder.hide()
+
         left_layout.addLayout(title_layout)
-        left_layout.addWidget(scroll_area, 1)
+        left_layout.addWidget(self.records_placeholder)
+        left_layout.addWidget(self.record_view, 1)
         
         # === 右侧：分析结果 ===
         right_panel = QWidget(self)
@@ -212,53 +390,74 @@ class AnalysisInterface(QWidget):
         self.current_patient = None
         self.current_csv_path = None
         self.analysis_worker = None
+        # 子图/曲线项在首次绘图时创建, 之后复用
+        self._plots_ready = False
+        # 记录文件列表缓存: 每次切到本界面都重扫目录太浪费,
+        # 仅在删除/刷新/切换患者/新录制落盘时失效
+        self._records_cache = None
 
     def set_current_patient(self, p_id, p_name):
         self.current_patient = (p_id, p_name)
+        self._records_cache = None
 
-    def load_records(self):
-        """ 加载记录卡片 """
-        # 清空
-        for i in reversed(range(self.card_layout.count())):
-            item = self.card_layout.itemAt(i)
-            if item and item.widget():
-                item.widget().deleteLater()
-        
+    def invalidate_records_cache(self):
+        """ 新录制写入磁盘后调用, 下次 load_records 重新扫描目录 """
+        self._records_cache = None
+
+    @staticmethod
+    def _scan_csv_files(root):
+        """
+        用 os.scandir 递归收集 csv 文件
+        scandir 的 DirEntry 自带类型信息, 比 glob/listdir 少一次
+        per-entry stat 系统调用
+        """
+        found = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.csv'):
+                            found.append(entry.path)
+            except OSError:
+                pass
+        return found
+
+    def _show_placeholder(self, text):
+        self.record_model.set_records([])
+        self.records_placeholder.setText(text)
+        self.records_placeholder.show()
+
+    def load_records(self, force=False):
+        """ 加载记录列表 """
         if not self.current_patient:
-            placeholder = BodyLabel("请先选择患者", self)
-            placeholder.setAlignment(Qt.AlignCenter)
-            placeholder.setStyleSheet("color: gray; padding: 30px;")
-            self.card_layout.addWidget(placeholder)
+            self._show_placeholder("请先选择患者")
             return
         
         p_id, p_name = self.current_patient
-        safe_name = "".join([c for c in p_name if c.isalpha() or c.isdigit() or c==' ']).strip()
-        folder_name = f"{p_id}_{safe_name}"
-        
-        pattern = os.path.join("Data", folder_name, "**", "*.csv")
-        csv_files = glob.glob(pattern, recursive=True)
-        
+        folder_name = f"{p_id}_{safe_name(p_name)}"
+
+        if force or self._records_cache is None:
+            self._records_cache = self._scan_csv_files(os.path.join("Data", folder_name))
+        csv_files = self._records_cache
+
         if not csv_files:
-            placeholder = BodyLabel("暂无检查记录\n请前往「实时检查」录制数据", self)
-            placeholder.setAlignment(Qt.AlignCenter)
-            placeholder.setStyleSheet("color: gray; padding: 30px;")
-            self.card_layout.addWidget(placeholder)
+            self._show_placeholder("暂无检查记录\n请前往「实时检查」录制数据")
             return
-        
-        # 添加卡片
+
+        records = []
         for csv_path in sorted(csv_files, reverse=True):
             rel_path = os.path.relpath(csv_path, "Data")
             parts = rel_path.split(os.sep)
             test_type = parts[1] if len(parts) > 1 else "Unknown"
             filename = os.path.splitext(os.path.basename(csv_path))[0]
-            
-            card = RecordCard(csv_path, test_type, filename, self)
-            card.clicked.connect(self.on_record_selected)
-            card.delete_requested.connect(self.delete_record)
-            
-            self.card_layout.addWidget(card)
-        
-        self.card_layout.addStretch(1)
+            records.append((csv_path, test_type, filename))
+
+        self.records_placeholder.hide()
+        self.record_model.set_records(records)
 
     def delete_record(self, csv_path):
         filename = os.path.basename(csv_path)
@@ -274,12 +473,13 @@ class AnalysisInterface(QWidget):
                     os.remove(video_path)
                 
                 InfoBar.success(title='已删除', content="记录删除成功", parent=self)
+                self._records_cache = None
                 self.load_records()
                 
                 if csv_path == self.current_csv_path:
                     self.current_csv_path = None
                     self.result_label.setText("记录已删除，请选择其他记录")
-                    self.plot_widget.clear()
+                    self.clear_plots()
                     self.btn_analyze.setEnabled(False)
                     
             except Exception as e:
@@ -299,11 +499,18 @@ class AnalysisInterface(QWidget):
         
         self.result_label.setText("分析中...")
         self.btn_analyze.setEnabled(False)
-        
+
+        # 取消仍在跑的上一次分析: 断开信号防止旧结果覆盖新结果,
+        # 任务在下一个阶段边界检查取消标志后自行退出
+        if self.analysis_worker is not None:
+            self.analysis_worker.signals.finished.disconnect(self.on_analysis_finished)
+            self.analysis_worker.signals.error.disconnect(self.on_analysis_error)
+            self.analysis_worker.cancel()
+
         self.analysis_worker = AnalysisWorker(self.current_csv_path, axis)
-        self.analysis_worker.finished.connect(self.on_analysis_finished)
-        self.analysis_worker.error.connect(self.on_analysis_error)
-        self.analysis_worker.start()
+        self.analysis_worker.signals.finished.connect(self.on_analysis_finished)
+        self.analysis_worker.signals.error.connect(self.on_analysis_error)
+        QThreadPool.globalInstance().start(self.analysis_worker)
 
     @Slot(dict)
     def on_analysis_finished(self, result):
@@ -323,58 +530,100 @@ class AnalysisInterface(QWidget):
         self.btn_analyze.setEnabled(True)
         self.result_label.setText(f"❌ 分析失败: {error_msg}")
 
-    def plot_results(self, result):
-        self.plot_widget.clear()
-        
+    def _init_plots(self):
+        """
+        首次绘图时搭建三个子图和固定的曲线项
+        之后的每次分析只 setData 更新数据, 不再 clear()/addPlot 重建场景,
+        省去图元/坐标轴/图例的反复构建
+        """
         p1 = self.plot_widget.addPlot(row=0, col=0, title="1. 原始信号 vs 滤波后")
         p2 = self.plot_widget.addPlot(row=1, col=0, title="2. 转折点检测")
         p3 = self.plot_widget.addPlot(row=2, col=0, title="3. 眼震模式 (红=快相, 蓝=慢相)")
-        
-        # Plot 1
-        p1.plot(result['timestamps'], result['eye_angles'], 
-               pen=pg.mkPen(color=(200, 200, 200), width=1), name='原始')
-        p1.plot(result['time'], result['filtered_signal'], 
-               pen=pg.mkPen(color='#FF5252', width=2), name='滤波后')
-        p1.setLabel('left', 'Angle', units='°')
+
+        # 插值后的信号点数远超屏幕像素宽度:
+        # peak 降采样保留极值包络, 视野裁剪只画当前可见区间
+        for p in (p1, p2, p3):
+            p.setDownsampling(auto=True, mode='peak')
+            p.setClipToView(True)
+
         p1.addLegend()
+        self._curve_raw = p1.plot(
+            pen=pg.mkPen(color=(200, 200, 200), width=1), name='原始')
+        self._curve_filtered = p1.plot(
+            pen=pg.mkPen(color='#FF5252', width=2), name='滤波后')
+        p1.setLabel('left', 'Angle', units='°')
         p1.showGrid(x=True, y=True, alpha=0.3)
-        
-        # Plot 2
-        p2.plot(result['time'], result['filtered_signal'], 
-               pen=pg.mkPen(color=(150, 150, 150), width=1, style=Qt.DotLine))
-        
-        if len(result['turning_points']) > 0:
-            p2.plot(result['time'][result['turning_points']], 
-                   result['filtered_signal'][result['turning_points']], 
-                   pen=None, symbol='o', symbolBrush='r', symbolSize=8)
-        
+
+        self._curve_tp_signal = p2.plot(
+            pen=pg.mkPen(color=(150, 150, 150), width=1, style=Qt.DotLine))
+        self._scatter_tp = p2.plot(
+            pen=None, symbol='o', symbolBrush='r', symbolSize=8)
         p2.setLabel('left', 'Angle', units='°')
         p2.showGrid(x=True, y=True, alpha=0.3)
-        
+
+        self._curve_pattern_signal = p3.plot(
+            pen=pg.mkPen(color=(180, 180, 180), width=1, style=Qt.DashLine))
+        self._curve_fast = p3.plot(
+            pen=pg.mkPen(color='#FF5252', width=4), connect='finite')
+        self._curve_slow = p3.plot(
+            pen=pg.mkPen(color='#448AFF', width=4), connect='finite')
+        p3.setLabel('left', 'Angle', units='°')
+        p3.setLabel('bottom', 'Time', units='s')
+        p3.showGrid(x=True, y=True, alpha=0.3)
+
+        self._plots_ready = True
+
+    def clear_plots(self):
+        """ 清空曲线数据 (保留子图结构) """
+        if not self._plots_ready:
+            return
+        for item in (self._curve_raw, self._curve_filtered,
+                     self._curve_tp_signal, self._scatter_tp,
+                     self._curve_pattern_signal, self._curve_fast, self._curve_slow):
+            item.setData([], [])
+
+    def plot_results(self, result):
+        if not self._plots_ready:
+            self._init_plots()
+
+        # Plot 1
+        self._curve_raw.setData(result['timestamps'], result['eye_angles'])
+        self._curve_filtered.setData(result['time'], result['filtered_signal'])
+
+        # Plot 2
+        self._curve_tp_signal.setData(result['time'], result['filtered_signal'])
+        if len(result['turning_points']) > 0:
+            self._scatter_tp.setData(result['time'][result['turning_points']],
+                                     result['filtered_signal'][result['turning_points']])
+        else:
+            self._scatter_tp.setData([], [])
+
         # Plot 3
-        p3.plot(result['time'], result['filtered_signal'], 
-               pen=pg.mkPen(color=(180, 180, 180), width=1, style=Qt.DashLine))
-        
+        self._curve_pattern_signal.setData(result['time'], result['filtered_signal'])
+
+        # 所有快相/慢相各拼成一条 NaN 分隔的折线, 两次 plot 画完:
+        # 每个模式两次 addItem 会让图元数量随模式数线性增长, 拖慢重绘
+        nan1 = np.array([np.nan])
+        fast_t, fast_s, slow_t, slow_s = [], [], [], []
         for pattern in result['patterns']:
             idx = pattern['index']
             if idx > 0 and idx + 1 < len(result['turning_points']):
                 tp = result['turning_points']
                 idx1, idx2, idx3 = tp[idx-1], tp[idx], tp[idx+1]
-                
+
                 if pattern['fast_phase_first']:
-                    fast_t = result['time'][idx1:idx2+1]
-                    fast_s = result['filtered_signal'][idx1:idx2+1]
-                    slow_t = result['time'][idx2:idx3+1]
-                    slow_s = result['filtered_signal'][idx2:idx3+1]
+                    fast_slice, slow_slice = slice(idx1, idx2+1), slice(idx2, idx3+1)
                 else:
-                    slow_t = result['time'][idx1:idx2+1]
-                    slow_s = result['filtered_signal'][idx1:idx2+1]
-                    fast_t = result['time'][idx2:idx3+1]
-                    fast_s = result['filtered_signal'][idx2:idx3+1]
-                
-                p3.plot(fast_t, fast_s, pen=pg.mkPen(color='#FF5252', width=4))
-                p3.plot(slow_t, slow_s, pen=pg.mkPen(color='#448AFF', width=4))
-        
-        p3.setLabel('left', 'Angle', units='°')
-        p3.setLabel('bottom', 'Time', units='s')
-        p3.showGrid(x=True, y=True, alpha=0.3)
+                    slow_slice, fast_slice = slice(idx1, idx2+1), slice(idx2, idx3+1)
+
+                fast_t += [result['time'][fast_slice], nan1]
+                fast_s += [result['filtered_signal'][fast_slice], nan1]
+                slow_t += [result['time'][slow_slice], nan1]
+                slow_s += [result['filtered_signal'][slow_slice], nan1]
+
+        if fast_t:
+            self._curve_fast.setData(np.concatenate(fast_t), np.concatenate(fast_s))
+            self._curve_slow.setData(np.concatenate(slow_t), np.concatenate(slow_s))
+        else:
+            self._curve_fast.setData([], [])
+            self._curve_slow.setData([], [])
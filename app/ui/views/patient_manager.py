@@ -1,12 +1,128 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QTableWidgetItem
-from PySide6.QtCore import Qt, Signal
-from qfluentwidgets import (SubtitleLabel, PrimaryPushButton, TableWidget, 
-                            FluentIcon, LineEdit, InfoBar, InfoBarPosition, MessageBox, TransparentToolButton)
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QHeaderView,
+                               QTableView, QStyledItemDelegate)
+from PySide6.QtCore import (Qt, Signal, QTimer, QEvent, QRect,
+                            QModelIndex, QAbstractTableModel)
+from qfluentwidgets import (SubtitleLabel, PrimaryPushButton,
+                            FluentIcon, LineEdit, InfoBar, InfoBarPosition, MessageBox)
+
+from collections import namedtuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
 
 from app.database.db_manager import db
-from app.database.models import Patient
+from app.database.models import Patient, ExamRecord
 from app.ui.components.add_patient_dialog import AddPatientDialog
 
+# 删除图标在模块导入时取一次 QIcon, 所有行共享同一份解码结果
+_DELETE_ICON = FluentIcon.DELETE.icon()
+
+# 模型里只保留展示需要的字段, 不持有 ORM 对象:
+# 会话关闭后没有 detached-instance 风险, 也不用为未展示的列付水合成本
+PatientRow = namedtuple('PatientRow', ['id', 'patient_id', 'name', 'gender', 'birth_date'])
+
+class PatientTableModel(QAbstractTableModel):
+    """
+    患者列表数据模型
+    QTableView 只为可见行调用 data(), 不再像 QTableWidget 那样
+    为每行预先创建 6 个 item + 一个按钮容器控件
+    """
+    HEADERS = ['ID', '病历号', '姓名', '性别', '出生日期', '操作']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._patients = []
+        self._total = 0
+        self._fetch_page = None
+
+    def set_patients(self, patients, total=None, fetch_page=None):
+        """
+        重置为第一页数据
+        total 为满足条件的总行数, fetch_page(offset) 负责按需取下一页
+        """
+        self.beginResetModel()
+        self._patients = list(patients)
+        self._total = total if total is not None else len(self._patients)
+        self._fetch_page = fetch_page
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._fetch_page is not None and len(self._patients) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        # 滚动到底部时视图自动请求下一页
+        patients = self._fetch_page(len(self._patients))
+        if not patients:
+            self._total = len(self._patients)
+            return
+        first = len(self._patients)
+        self.beginInsertRows(QModelIndex(), first, first + len(patients) - 1)
+        self._patients.extend(patients)
+        self.endInsertRows()
+
+    def patient_at(self, row):
+        return self._patients[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._patients)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        p = self._patients[index.row()]
+        if role == Qt.DisplayRole:
+            col = index.column()
+            if col == 0:
+                return str(p.id)
+            if col == 1:
+                return p.patient_id
+            if col == 2:
+                return p.name
+            if col == 3:
+                return p.gender or "-"
+            if col == 4:
+                return p.birth_date.strftime("%Y-%m-%d") if p.birth_date else "-"
+            return "" # 操作列由 delegate 绘制
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.UserRole:
+            # 轻量 PatientRow 元组, 而非 ORM 对象 (不会把会话对象留在视图里)
+            return p
+        return None
+
+class PatientDeleteDelegate(QStyledItemDelegate):
+    """
+    操作列 delegate: 画一个删除图标并处理点击
+    替代每行一个 QWidget+QHBoxLayout+按钮 的 setCellWidget 方案
+    """
+    delete_requested = Signal(int) # 行号
+
+    ICON_SIZE = 16
+
+    def _icon_rect(self, option_rect):
+        s = self.ICON_SIZE
+        return QRect(option_rect.center().x() - s // 2,
+                     option_rect.center().y() - s // 2, s, s)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        _DELETE_ICON.paint(painter, self._icon_rect(option.rect))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if self._icon_rect(option.rect).contains(event.pos()):
+                self.delete_requested.emit(index.row())
+                return True
+        return False
+
 class PatientManagerInterface(QWidget):
     """ 患者管理界面 """
     
@@ -28,7 +144,14 @@ class PatientManagerInterface(QWidget):
         self.search_bar = LineEdit(self)
         self.search_bar.setPlaceholderText("搜索姓名或病历号...")
         self.search_bar.setFixedWidth(300)
-        self.search_bar.textChanged.connect(self.load_patients) # 实时搜索
+        self.search_bar.textChanged.connect(self.load_patients) # 实时搜索 (防抖)
+
+        # 搜索防抖: 每个按键都打一次数据库太浪费,
+        # 停止输入 200ms 后才真正执行查询
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self._do_load_patients)
 
         self.btn_add = PrimaryPushButton(FluentIcon.ADD, "新建患者", self)
         self.btn_add.clicked.connect(self.show_add_patient_dialog)
@@ -38,74 +161,96 @@ class PatientManagerInterface(QWidget):
         self.h_layout.addWidget(self.search_bar)
         self.h_layout.addWidget(self.btn_add)
 
-        # --- 表格区域 ---
-        self.table = TableWidget(self)
-        self.table.setColumnCount(6) # ID, 病历号, 姓名, 性别, 出生日期, 操作
-        self.table.setHorizontalHeaderLabels(['ID', '病历号', '姓名', '性别', '出生日期', '操作'])
+        # --- 表格区域 (model/view) ---
+        self.model = PatientTableModel(self)
+
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        # 数据经由模型的 reset/insertRows 批量进入, 视图每批只做一次布局,
+        # 不需要 QTableWidget 时代 setUpdatesEnabled/setSortingEnabled 的逐项保护
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().hide()
-        self.table.setEditTriggers(TableWidget.NoEditTriggers) # 禁止直接编辑
-        
+        self.table.setEditTriggers(QTableView.NoEditTriggers) # 禁止直接编辑
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setMouseTracking(True)
+
+        # 操作列: delegate 绘制删除图标, 无需每行实例化按钮控件
+        self._delete_delegate = PatientDeleteDelegate(self)
+        self._delete_delegate.delete_requested.connect(self._on_delete_clicked)
+        self.table.setItemDelegateForColumn(5, self._delete_delegate)
+
         # 选中行时触发
-        self.table.itemDoubleClicked.connect(self.on_row_double_clicked)
+        self.table.doubleClicked.connect(self.on_row_double_clicked)
 
         self.v_layout.addLayout(self.h_layout)
         self.v_layout.addWidget(self.table)
 
+        # 界面持有一个长会话: 避免每次查询都经历 获取连接/关闭会话 的流程,
+        # 读取前 expire_all() 保证数据新鲜
+        self._session = db.get_session()
+
+        # 分页: 首次只取一页, 滚动到底部时模型按需追加下一页,
+        # 首屏开销不随患者总数增长
+        self._page_size = 100
+        self._current_search = ""
+
         # 初始化数据
-        self.load_patients()
+        self._do_load_patients()
 
     def load_patients(self):
-        """ 从数据库加载患者列表 """
+        """ 重启防抖计时器, 超时后执行真正的查询 """
+        self._search_timer.start()
+
+    @staticmethod
+    def _rows(query):
+        """ 流式物化为轻量行元组, yield_per 限制一次水合的对象数 """
+        return [PatientRow(p.id, p.patient_id, p.name, p.gender, p.birth_date)
+                for p in query.yield_per(200)]
+
+    def _build_query(self, session, search_text):
+        # 只加载展示的 5 个字段
+        query = session.query(Patient).options(load_only(
+            Patient.patient_id, Patient.name, Patient.gender, Patient.birth_date))
+        # 少于 2 个字符不过滤: 太短的关键词命中面太大, 查了也没意义
+        if search_text and len(search_text) >= 2:
+            if search_text.startswith('*'):
+                # '*' 开头显式要求任意位置匹配 (无法走索引, 全表扫描)
+                text = search_text[1:]
+                query = query.filter(
+                    (Patient.name.contains(text)) |
+                    (Patient.patient_id.contains(text))
+                )
+            else:
+                # 前缀匹配: LIKE 'text%' 可以走 B-tree 索引
+                query = query.filter(
+                    (Patient.name.like(f"{search_text}%")) |
+                    (Patient.patient_id.like(f"{search_text}%"))
+                )
+        return query.order_by(Patient.created_at.desc())
+
+    def _fetch_page(self, offset):
+        """ 按需取下一页 (模型 fetchMore 回调) """
+        return self._rows(self._build_query(self._session, self._current_search)
+                          .limit(self._page_size).offset(offset))
+
+    def _do_load_patients(self):
+        """ 从数据库加载患者列表 (首页 + 总数, 余下分页懒加载) """
         search_text = self.search_bar.text().strip()
-        session = db.get_session()
-        
-        query = session.query(Patient)
-        if search_text:
-            # 模糊搜索
-            query = query.filter(
-                (Patient.name.contains(search_text)) | 
-                (Patient.patient_id.contains(search_text))
-            )
-        
-        patients = query.order_by(Patient.created_at.desc()).all()
-        
-        self.table.setRowCount(len(patients))
-        
-        for row, p in enumerate(patients):
-            self.table.setItem(row, 0, QTableWidgetItem(str(p.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(p.patient_id))
-            self.table.setItem(row, 2, QTableWidgetItem(p.name))
-            self.table.setItem(row, 3, QTableWidgetItem(p.gender or "-"))
-            
-            birth_str = p.birth_date.strftime("%Y-%m-%d") if p.birth_date else "-"
-            self.table.setItem(row, 4, QTableWidgetItem(birth_str))
-            
-            # 添加删除按钮
-            self._add_action_buttons(row, p.id, p.name)
-            
-            # 存储 Patient 对象在第一列的 item 数据里，方便后续获取
-            self.table.item(row, 0).setData(Qt.UserRole, p)
+        self._current_search = search_text
+        # 丢弃已缓存的对象状态, 保证读到其他界面提交后的最新数据
+        self._session.expire_all()
 
-        session.close()
+        query = self._build_query(self._session, search_text)
+        # count(Patient.id) 而非 count(): 空搜索时查询没有 WHERE,
+        # 裸 count() 推不出 FROM 表, 会编译成 SELECT count(*) 恒为 1
+        total = query.order_by(None).with_entities(func.count(Patient.id)).scalar()
+        patients = self._rows(query.limit(self._page_size))
 
-    def _add_action_buttons(self, row, patient_id, patient_name):
-        """ 在表格行添加操作按钮 """
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(4)
-        
-        # 删除按钮
-        btn_delete = TransparentToolButton(FluentIcon.DELETE, self)
-        btn_delete.setToolTip("删除患者")
-        btn_delete.clicked.connect(lambda: self.delete_patient(patient_id, patient_name))
-        
-        layout.addStretch(1)
-        layout.addWidget(btn_delete)
-        layout.addStretch(1)
-        
-        self.table.setCellWidget(row, 5, widget)
+        self.model.set_patients(patients, total, self._fetch_page)
+
+    def _on_delete_clicked(self, row):
+        p = self.model.patient_at(row)
+        self.delete_patient(p.id, p.name)
 
     def delete_patient(self, patient_id, patient_name):
         """ 删除患者 """
@@ -115,13 +260,21 @@ class PatientManagerInterface(QWidget):
             self
         )
         if w.exec():
-            session = db.get_session()
             try:
-                patient = session.query(Patient).get(patient_id)
-                if patient:
-                    session.delete(patient)
-                    session.commit()
-                    
+                # 批量 DELETE, 不加载 ORM 对象
+                # 检查记录显式删除而不是依赖外键级联: 老库的 exam_records
+                # 是没有 ON DELETE CASCADE 时建的 (create_all 不会改已有表),
+                # 开着 PRAGMA foreign_keys 直接删患者会报外键约束错误
+                (self._session.query(ExamRecord)
+                 .filter_by(patient_pk=patient_id)
+                 .delete(synchronize_session=False))
+                deleted = (self._session.query(Patient)
+                           .filter_by(id=patient_id)
+                           .delete(synchronize_session=False))
+                if deleted:
+                    self._session.commit()
+                    db.invalidate_patient_cache()
+
                     InfoBar.success(
                         title='已删除',
                         content=f"患者 {patient_name} 删除成功",
@@ -131,25 +284,22 @@ class PatientManagerInterface(QWidget):
                         duration=2000,
                         parent=self
                     )
-                    self.load_patients()
+                    self._do_load_patients()
             except Exception as e:
+                self._session.rollback()
                 InfoBar.error(
                     title='错误',
                     content=f"删除失败: {str(e)}",
                     parent=self
                 )
-            finally:
-                session.close()
 
-    def on_row_double_clicked(self, item):
+    def on_row_double_clicked(self, index):
         """ 双击行进入检查 """
-        row = item.row()
-        patient_item = self.table.item(row, 0)
-        if not patient_item:
+        if not index.isValid():
             return
-            
-        patient = patient_item.data(Qt.UserRole)
-        
+
+        patient = self.model.patient_at(index.row())
+
         # 发送信号通知主窗口
         self.patient_selected.emit(patient.id, patient.name)
 
@@ -159,11 +309,9 @@ class PatientManagerInterface(QWidget):
         if w.exec():
             data = w.get_data()
             
-            session = db.get_session()
             try:
-                # 检查 ID 是否重复
-                existing = session.query(Patient).filter_by(patient_id=data['patient_id']).first()
-                if existing:
+                # 检查 ID 是否重复 (走带缓存的查询入口, 命中时不打数据库)
+                if db.get_patient(data['patient_id']) is not None:
                     InfoBar.error(
                         title='错误',
                         content=f"病历号 {data['patient_id']} 已存在",
@@ -178,9 +326,10 @@ class PatientManagerInterface(QWidget):
                     birth_date=data['birth_date'],
                     phone=data['phone']
                 )
-                session.add(new_p)
-                session.commit()
-                
+                self._session.add(new_p)
+                self._session.commit()
+                db.invalidate_patient_cache()
+
                 InfoBar.success(
                     title='成功',
                     content=f"已添加患者: {new_p.name}",
@@ -190,12 +339,15 @@ class PatientManagerInterface(QWidget):
                     duration=2000,
                     parent=self
                 )
-                self.load_patients()
+                self._do_load_patients()
             except Exception as e:
+                self._session.rollback()
                 InfoBar.error(
                     title='错误',
                     content=str(e),
                     parent=self
                 )
-            finally:
-                session.close()
+
+    def closeEvent(self, event):
+        self._session.close()
+        super().closeEvent(event)
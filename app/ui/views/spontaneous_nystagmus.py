@@ -1,69 +1,14 @@
 import os
 import time
 from datetime import datetime
-import numpy as np
-import pyqtgraph as pg
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import Qt, Slot, QSize, QTimer
 from PySide6.QtGui import QPixmap
 from qfluentwidgets import SubtitleLabel, PushButton, FluentIcon, CardWidget, InfoBar
 
 from app.core.camera import CameraThread
-
-class GazePlotWidget(pg.PlotWidget):
-    """ 实时眼动波形图组件 """
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        
-        self.setBackground('w') # 白色背景
-        self.showGrid(x=True, y=True, alpha=0.3)
-        self.setLabel('left', 'Angle (deg)')
-        self.setLabel('bottom', 'Time (s)')
-        self.setYRange(-45, 45)
-        
-        # 初始化曲线
-        self.pitch_curve = self.plot(pen=pg.mkPen(color='#FF5252', width=2), name='Pitch') # 红色
-        self.yaw_curve = self.plot(pen=pg.mkPen(color='#448AFF', width=2), name='Yaw')   # 蓝色
-        
-        # 数据缓冲区
-        self.buffer_size = 300 # 显示最近300个点 (约5秒 @ 60fps)
-        self.times = np.zeros(self.buffer_size)
-        self.pitch_data = np.zeros(self.buffer_size)
-        self.yaw_data = np.zeros(self.buffer_size)
-
-    def update_data(self, t, p, y):
-        # 滚动更新数据
-        self.times[:-1] = self.times[1:]
-        self.pitch_data[:-1] = self.pitch_data[1:]
-        self.yaw_data[:-1] = self.yaw_data[1:]
-        
-        self.times[-1] = t
-        self.pitch_data[-1] = p
-        self.yaw_data[-1] = y
-        
-        self.pitch_curve.setData(self.times, self.pitch_data)
-        self.yaw_curve.setData(self.times, self.yaw_data)
-
-class EyeRoiWidget(CardWidget):
-    """ 眼部特写显示组件 """
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        self.v_layout = QVBoxLayout(self)
-        
-        self.title = QLabel("眼部特写 (Eye ROI)", self)
-        self.img_label = QLabel("等待数据...", self)
-        self.img_label.setAlignment(Qt.AlignCenter)
-        self.img_label.setMinimumSize(120, 80)
-        self.img_label.setStyleSheet("background-color: #000; border-radius: 4px; color: gray;")
-        
-        self.v_layout.addWidget(self.title)
-        self.v_layout.addWidget(self.img_label, 1)
-
-    def update_image(self, qt_image):
-        pixmap = QPixmap.fromImage(qt_image).scaled(
-            self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.img_label.setPixmap(pixmap)
+from app.core.naming import safe_name
+from app.ui.components.gaze_widgets import GazePlotWidget, EyeRoiWidget
 
 class CameraInterface(QWidget):
     """ 仪表盘式检查界面 """
@@ -130,6 +75,19 @@ class CameraInterface(QWidget):
         self.camera_thread.eye_roi_received.connect(self.roi_widget.update_image)
         self.camera_thread.gaze_data_received.connect(self.update_gaze_data)
         
+        # 主画面缩放目标尺寸缓存
+        self._last_src_size = QSize()
+        self._last_label_size = QSize()
+        self._video_scaled_size = QSize()
+        self._pixmap = QPixmap()
+
+        # 数值标签 10Hz 刷新即可, 不必跟着 120Hz 采样率重排版文本
+        self._latest_gaze = None
+        self._label_timer = QTimer(self)
+        self._label_timer.setInterval(100)
+        self._label_timer.timeout.connect(self._refresh_gaze_labels)
+        self._label_timer.start()
+
         self.is_camera_on = False
         self.current_patient = None # (id, name, patient_id_str)
 
@@ -142,10 +100,14 @@ class CameraInterface(QWidget):
         self.video_label.setText("准备就绪")
 
     def toggle_camera(self):
+        # 短暂禁用按钮: 连点会让 VideoCapture 的关闭/重开互相穿插,
+        # 在部分平台 (尤其 Windows) 上会把摄像头句柄卡死
+        self.btn_start.setEnabled(False)
         if self.is_camera_on:
             self.stop_capture()
         else:
             self.start_capture()
+        QTimer.singleShot(500, lambda: self.btn_start.setEnabled(True))
 
     def start_capture(self):
         if not self.current_patient:
@@ -156,12 +118,10 @@ class CameraInterface(QWidget):
         # 格式: Data/{PatientName}_{ID}/{Timestamp}.mkv
         p_id, p_name = self.current_patient
         # 清理文件名非法字符
-        safe_name = "".join([c for c in p_name if c.isalpha() or c.isdigit() or c==' ']).strip()
-        folder_name = f"{p_id}_{safe_name}"
+        folder_name = f"{p_id}_{safe_name(p_name)}"
         
         save_dir = os.path.join("Data", folder_name)
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
+        os.makedirs(save_dir, exist_ok=True)
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         save_path = os.path.join(save_dir, f"{timestamp}.mkv")
@@ -187,16 +147,36 @@ class CameraInterface(QWidget):
 
     @Slot(QPixmap)
     def update_main_frame(self, qt_image):
-        scaled = QPixmap.fromImage(qt_image).scaled(
-            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.video_label.setPixmap(scaled)
+        # 先在 QImage 上缩放, 只把缩好的小图转成 QPixmap:
+        # 省掉整幅原图 QImage->QPixmap 的深拷贝 (960x540 下每帧 ~1.5MB)
+        scaled = qt_image.scaled(self._video_target_size(qt_image),
+                                 Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        self._pixmap.convertFromImage(scaled)
+        self.video_label.setPixmap(self._pixmap)
+
+    def _video_target_size(self, qt_image):
+        # 同 EyeRoiWidget: 目标尺寸只在 label/源尺寸变化时重算
+        if (qt_image.size() != self._last_src_size
+                or self.video_label.size() != self._last_label_size):
+            self._last_src_size = QSize(qt_image.size())
+            self._last_label_size = QSize(self.video_label.size())
+            self._video_scaled_size = self._last_src_size.scaled(
+                self._last_label_size, Qt.KeepAspectRatio)
+        return self._video_scaled_size
 
-    @Slot(float, float, float)
-    def update_gaze_data(self, t, p, y):
+    @Slot(object)
+    def update_gaze_data(self, samples):
+        """ 接收 (n,3) 的 [t, pitch, yaw] 样本批, 向量化写入波形缓冲 """
+        self._latest_gaze = samples[-1]
+        self.plot_widget.update_batch(samples)
+
+    def _refresh_gaze_labels(self):
+        if self._latest_gaze is None:
+            return
+        _, p, y = self._latest_gaze
+        self._latest_gaze = None
         self.lbl_pitch.setText(f"Pitch: {p:.1f}°")
         self.lbl_yaw.setText(f"Yaw: {y:.1f}°")
-        self.plot_widget.update_data(t, p, y)
 
     def closeEvent(self, event):
         self.camera_thread.stop()
@@ -1,66 +1,33 @@
 import os
 from datetime import datetime
-import numpy as np
-import pyqtgraph as pg
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import (Qt, Signal, Slot, QSize, QTimer,
+                            QObject, QRunnable, QThreadPool)
 from PySide6.QtGui import QPixmap
 from qfluentwidgets import SubtitleLabel, PushButton, FluentIcon, CardWidget, InfoBar, ComboBox
 
 from app.core.camera import CameraThread
+from app.core.naming import safe_name
+from app.ui.components.gaze_widgets import GazePlotWidget, EyeRoiWidget
 from app.core.preview import PreviewThread, enumerate_cameras
 
-class GazePlotWidget(pg.PlotWidget):
-    """ 实时眼动波形图组件 """
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        
-        self.setBackground('w')
-        self.showGrid(x=True, y=True, alpha=0.3)
-        self.setLabel('left', 'Angle (deg)')
-        self.setLabel('bottom', 'Time (s)')
-        self.setYRange(-45, 45)
-        
-        self.pitch_curve = self.plot(pen=pg.mkPen(color='#FF5252', width=2), name='Pitch')
-        self.yaw_curve = self.plot(pen=pg.mkPen(color='#448AFF', width=2), name='Yaw')
-        
-        self.buffer_size = 300
-        self.times = np.zeros(self.buffer_size)
-        self.pitch_data = np.zeros(self.buffer_size)
-        self.yaw_data = np.zeros(self.buffer_size)
+class _CameraScanSignals(QObject):
+    done = Signal(list)
 
-    def update_data(self, t, p, y):
-        self.times[:-1] = self.times[1:]
-        self.pitch_data[:-1] = self.pitch_data[1:]
-        self.yaw_data[:-1] = self.yaw_data[1:]
-        
-        self.times[-1] = t
-        self.pitch_data[-1] = p
-        self.yaw_data[-1] = y
-        
-        self.pitch_curve.setData(self.times, self.pitch_data)
-        self.yaw_curve.setData(self.times, self.yaw_data)
+class _CameraScanTask(QRunnable):
+    """ 后台扫描摄像头: 每个 id 的探测可能耗时数百毫秒, 不能放在构造函数里 """
+    def __init__(self, signals):
+        super().__init__()
+        self.signals = signals
 
-class EyeRoiWidget(CardWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        self.v_layout = QVBoxLayout(self)
-        self.title = QLabel("眼部特写 (ROI)", self)
-        self.img_label = QLabel("Waiting...", self)
-        self.img_label.setAlignment(Qt.AlignCenter)
-        self.img_label.setMinimumSize(120, 80)
-        self.img_label.setStyleSheet("background-color: #000; border-radius: 4px; color: gray;")
-        self.v_layout.addWidget(self.title)
-        self.v_layout.addWidget(self.img_label, 1)
-
-    def update_image(self, qt_image):
-        pixmap = QPixmap.fromImage(qt_image).scaled(
-            self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.img_label.setPixmap(pixmap)
+    def run(self):
+        self.signals.done.emit(enumerate_cameras(max_check=5))
 
 class SpontaneousTestInterface(QWidget):
     """ 自发性眼震检查界面 (Spontaneous Nystagmus Test) """
+
+    recording_finished = Signal() # 一次录制结束并落盘
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.setObjectName("SpontaneousTestInterface")
@@ -143,13 +110,35 @@ class SpontaneousTestInterface(QWidget):
         # 预览线程 (仅用于预览，不录制)
         self.preview_thread = None
         
+        # 主画面缩放目标尺寸缓存
+        self._last_src_size = QSize()
+        self._last_label_size = QSize()
+        self._video_scaled_size = QSize()
+        self._pixmap = QPixmap()
+
+        # 数值标签 10Hz 刷新即可, 不必跟着 120Hz 采样率重排版文本
+        self._latest_gaze = None
+        self._label_timer = QTimer(self)
+        self._label_timer.setInterval(100)
+        self._label_timer.timeout.connect(self._refresh_gaze_labels)
+        self._label_timer.start()
+
         self.is_previewing = False
         self.is_recording = False
         self.current_patient = None
 
     def _populate_cameras(self):
-        """ 扫描可用摄像头并填充到下拉框 """
-        cameras = enumerate_cameras(max_check=5)
+        """ 异步扫描可用摄像头并填充到下拉框 (结果进程级缓存) """
+        self.camera_selector.addItem("检测摄像头中...")
+        self.camera_selector.setEnabled(False)
+
+        self._scan_signals = _CameraScanSignals()
+        self._scan_signals.done.connect(self._on_cameras_found)
+        QThreadPool.globalInstance().start(_CameraScanTask(self._scan_signals))
+
+    @Slot(list)
+    def _on_cameras_found(self, cameras):
+        self.camera_selector.clear()
         if not cameras:
             self.camera_selector.addItem("无可用摄像头")
             self.camera_selector.setEnabled(False)
@@ -157,6 +146,7 @@ class SpontaneousTestInterface(QWidget):
             for cam_id in cameras:
                 self.camera_selector.addItem(f"摄像头 {cam_id}", userData=cam_id)
             self.camera_selector.setCurrentIndex(0)
+            self.camera_selector.setEnabled(True)
 
     def _get_selected_camera_id(self):
         """ 获取当前选中的摄像头 ID """
@@ -170,10 +160,15 @@ class SpontaneousTestInterface(QWidget):
 
     def toggle_preview(self):
         """ 切换预览模式 """
+        # 短暂禁用按钮: 连点会让摄像头的关闭/重开互相穿插,
+        # 在部分平台 (尤其 Windows) 上会把摄像头句柄卡死
+        self.btn_preview.setEnabled(False)
         if self.is_previewing:
             self.stop_preview()
         else:
             self.start_preview()
+        # 录制中 btn_preview 应保持禁用, 恢复时要以当时的状态为准
+        QTimer.singleShot(500, lambda: self.btn_preview.setEnabled(not self.is_recording))
 
     def start_preview(self):
         """ 启动预览 (不录制) """
@@ -207,10 +202,13 @@ class SpontaneousTestInterface(QWidget):
 
     def toggle_recording(self):
         """ 切换正式检查录制模式 """
+        # 同 toggle_preview: 防止连点造成的启停竞争
+        self.btn_start.setEnabled(False)
         if self.is_recording:
             self.stop_recording()
         else:
             self.start_recording()
+        QTimer.singleShot(500, lambda: self.btn_start.setEnabled(True))
 
     def start_recording(self):
         """ 启动正式检查 (录制视频+数据) """
@@ -218,17 +216,11 @@ class SpontaneousTestInterface(QWidget):
             InfoBar.warning(title='警告', content="请先在患者列表选择一位患者", parent=self)
             return
 
-        # 如果正在预览，先停止
-        if self.is_previewing:
-            self.stop_preview()
-
         p_id, p_name = self.current_patient
-        safe_name = "".join([c for c in p_name if c.isalpha() or c.isdigit() or c==' ']).strip()
-        folder_name = f"{p_id}_{safe_name}"
+        folder_name = f"{p_id}_{safe_name(p_name)}"
         
         save_dir = os.path.join("Data", folder_name, "Spontaneous")
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
+        os.makedirs(save_dir, exist_ok=True)
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         video_path = os.path.join(save_dir, f"{timestamp}.mkv")
@@ -236,8 +228,12 @@ class SpontaneousTestInterface(QWidget):
         # 获取选中的摄像头ID并设置到camera_thread
         cam_id = self._get_selected_camera_id()
         self.camera_thread.camera_id = cam_id
+        # 先启动录制订阅 (acquire), 再停预览 (release):
+        # 共享源引用计数不归零, 预览->录制切换不会关闭再重开摄像头
         self.camera_thread.start(save_path=video_path)
-        
+        if self.is_previewing:
+            self.stop_preview()
+
         self.btn_start.setText("停止检查")
         try:
             self.btn_start.setIcon(FluentIcon.PAUSE)
@@ -268,18 +264,41 @@ class SpontaneousTestInterface(QWidget):
         self.btn_preview.setEnabled(True)
         self.camera_selector.setEnabled(True)
 
+        # 通知分析侧: 有新记录落盘, 列表缓存需要失效
+        self.recording_finished.emit()
+
     @Slot(QPixmap)
     def update_main_frame(self, qt_image):
-        scaled = QPixmap.fromImage(qt_image).scaled(
-            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.video_label.setPixmap(scaled)
+        # 先在 QImage 上缩放, 只把缩好的小图转成 QPixmap:
+        # 省掉整幅原图 QImage->QPixmap 的深拷贝 (960x540 下每帧 ~1.5MB)
+        scaled = qt_image.scaled(self._video_target_size(qt_image),
+                                 Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        self._pixmap.convertFromImage(scaled)
+        self.video_label.setPixmap(self._pixmap)
 
-    @Slot(float, float, float)
-    def update_gaze_data(self, t, p, y):
+    def _video_target_size(self, qt_image):
+        # 同 EyeRoiWidget: 目标尺寸只在 label/源尺寸变化时重算
+        if (qt_image.size() != self._last_src_size
+                or self.video_label.size() != self._last_label_size):
+            self._last_src_size = QSize(qt_image.size())
+            self._last_label_size = QSize(self.video_label.size())
+            self._video_scaled_size = self._last_src_size.scaled(
+                self._last_label_size, Qt.KeepAspectRatio)
+        return self._video_scaled_size
+
+    @Slot(object)
+    def update_gaze_data(self, samples):
+        """ 接收 (n,3) 的 [t, pitch, yaw] 样本批, 向量化写入波形缓冲 """
+        self._latest_gaze = samples[-1]
+        self.plot_widget.update_batch(samples)
+
+    def _refresh_gaze_labels(self):
+        if self._latest_gaze is None:
+            return
+        _, p, y = self._latest_gaze
+        self._latest_gaze = None
         self.lbl_pitch.setText(f"Pitch: {p:.1f}°")
         self.lbl_yaw.setText(f"Yaw: {y:.1f}°")
-        self.plot_widget.update_data(t, p, y)
 
     @Slot(float)
     def update_fps(self, fps):
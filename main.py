@@ -1,12 +1,22 @@
 import os
 import sys
+import importlib.abc
 
 # Configure environment to force PySide6 usage and block PyQt5 to avoid conflicts
 os.environ["QT_API"] = "pyside6"
-sys.modules["PyQt5"] = None
-sys.modules["PyQt5.QtCore"] = None
-sys.modules["PyQt5.QtGui"] = None
-sys.modules["PyQt5.QtWidgets"] = None
+
+class _BlockPyQt5(importlib.abc.MetaPathFinder):
+    """
+    拦截所有 PyQt5 导入, 强制使用 PySide6
+    比 sys.modules[...] = None 哨兵干净: 抛出的是 ImportError (哨兵是 TypeError),
+    qfluentwidgets 等库的 try-PyQt5 探测可以正常落到 except ImportError 分支
+    """
+    def find_spec(self, name, path, target=None):
+        if name == "PyQt5" or name.startswith("PyQt5."):
+            raise ImportError("PyQt5 is blocked; this application uses PySide6")
+        return None
+
+sys.meta_path.insert(0, _BlockPyQt5())
 
 from PySide6.QtWidgets import QApplication
 from app.ui.main_window import MainWindow